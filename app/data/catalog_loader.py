@@ -0,0 +1,163 @@
+from __future__ import annotations
+import dataclasses
+import os
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow.parquet as pq
+except Exception:  # pragma: no cover
+    pq = None
+
+from app.data.sample_data import TopicItem, AudienceSegment
+from app.data.topic_store import TopicStore, TopicStoreBuilder
+from app.data.metric_series import MetricSeries
+
+TOPIC_COLUMNS = ("topic", "keywords", "base_popularity", "seasonality", "novelty")
+SEGMENT_COLUMNS = ("name", "share", "focus")
+METRIC_COLUMNS = ("timestamp", "er", "ctr")
+KEYWORD_SEP = ";"  # keywords in flat files (CSV): "AI;workflow;automation"
+
+class CatalogError(ValueError):
+    pass
+
+def _format_of(path: str) -> str:
+    ext = os.path.splitext(path)[1].lower()
+    if ext in (".csv", ".txt"):
+        return "csv"
+    if ext in (".jsonl", ".ndjson"):
+        return "jsonl"
+    if ext in (".parquet", ".pq"):
+        return "parquet"
+    raise CatalogError(f"Unsupported catalog format: {ext or path}")
+
+def iter_chunks(path: str, columns: Sequence[str], chunksize: int = 50_000) -> Iterator[pd.DataFrame]:
+    """Read a CSV / JSONL / Parquet file in chunks, yielding only the requested columns."""
+    fmt = _format_of(path)
+    if fmt == "csv":
+        reader = pd.read_csv(path, chunksize=chunksize, encoding="utf-8-sig", keep_default_na=False)
+    elif fmt == "jsonl":
+        reader = pd.read_json(path, lines=True, chunksize=chunksize, encoding="utf-8")
+    else:
+        if pq is None:
+            raise CatalogError("Parquet support requires pyarrow")
+        pf = pq.ParquetFile(path)
+        missing = [c for c in columns if c not in pf.schema_arrow.names]
+        if missing:
+            raise CatalogError(f"{os.path.basename(path)}: missing columns {missing}")
+        reader = (b.to_pandas() for b in pf.iter_batches(batch_size=chunksize, columns=list(columns)))
+
+    offset = 0
+    for chunk in reader:
+        missing = [c for c in columns if c not in chunk.columns]
+        if missing:
+            raise CatalogError(f"{os.path.basename(path)}: missing columns {missing}")
+        chunk = chunk[list(columns)]
+        chunk.index = pd.RangeIndex(offset, offset + len(chunk))
+        offset += len(chunk)
+        yield chunk
+
+def _unit_column(chunk: pd.DataFrame, col: str, path: str) -> np.ndarray:
+    values = pd.to_numeric(chunk[col], errors="coerce").to_numpy(dtype=float)
+    bad = ~np.isfinite(values) | (values < 0.0) | (values > 1.0)
+    if bad.any():
+        row = int(chunk.index[int(np.argmax(bad))])
+        raise CatalogError(f"{os.path.basename(path)}: row {row + 1}: '{col}' must be a number in 0..1")
+    return values
+
+def _keyword_lists(series: pd.Series, path: str = "") -> List[List[str]]:
+    out = []
+    for row, v in zip(series.index, series):
+        if isinstance(v, str):
+            kws = v.split(KEYWORD_SEP)
+        elif isinstance(v, (list, tuple, np.ndarray)):  # JSONL / Parquet arrays
+            kws = list(v)
+        elif v is None or (np.isscalar(v) and pd.isna(v)):  # null in JSONL / Parquet
+            kws = []
+        elif np.isscalar(v):  # e.g. a column of bare numbers in CSV
+            kws = [str(v)]
+        else:
+            raise CatalogError(f"{os.path.basename(path)}: row {int(row) + 1}: bad 'keywords'")
+        out.append([str(k).strip() for k in kws if str(k).strip()])
+    return out
+
+# (abspath, mtime_ns, size) -> parsed catalog
+_CACHE: Dict[Tuple[str, int, int], TopicStore] = {}
+_SEGMENTS_CACHE: Dict[Tuple[str, int, int], List[AudienceSegment]] = {}
+
+def _signature(path: str) -> Tuple[str, int, int]:
+    st = os.stat(path)
+    return os.path.abspath(path), st.st_mtime_ns, st.st_size
+
+def load_topic_store(path: str, chunksize: int = 50_000) -> TopicStore:
+    """Stream a topics file into a TopicStore; re-reads only when the file changes."""
+    sig = _signature(path)
+    cached = _CACHE.get(sig)
+    if cached is not None:
+        return cached
+
+    builder = TopicStoreBuilder()
+    for chunk in iter_chunks(path, TOPIC_COLUMNS, chunksize):
+        topics = chunk["topic"].astype(str).str.strip()
+        if (topics == "").any():
+            row = int(chunk.index[int(np.argmax((topics == "").to_numpy()))])
+            raise CatalogError(f"{os.path.basename(path)}: row {row + 1}: empty 'topic'")
+        builder.add(topics.tolist(), _keyword_lists(chunk["keywords"], path),
+                    _unit_column(chunk, "base_popularity", path),
+                    _unit_column(chunk, "seasonality", path),
+                    _unit_column(chunk, "novelty", path))
+    store = builder.build()
+
+    for old in [k for k in _CACHE if k[0] == sig[0]]:
+        del _CACHE[old]
+    _CACHE[sig] = store
+    return store
+
+def iter_topics(path: str, chunksize: int = 50_000) -> Iterator[TopicItem]:
+    for chunk in iter_chunks(path, TOPIC_COLUMNS, chunksize):
+        base = _unit_column(chunk, "base_popularity", path)
+        season = _unit_column(chunk, "seasonality", path)
+        nov = _unit_column(chunk, "novelty", path)
+        for j, (topic, kws) in enumerate(zip(chunk["topic"].astype(str), _keyword_lists(chunk["keywords"], path))):
+            yield TopicItem(topic=topic, keywords=kws, base_popularity=float(base[j]),
+                            seasonality=float(season[j]), novelty=float(nov[j]))
+
+def iter_segments(path: str, chunksize: int = 50_000) -> Iterator[AudienceSegment]:
+    for chunk in iter_chunks(path, SEGMENT_COLUMNS, chunksize):
+        share = _unit_column(chunk, "share", path)
+        for j, (name, focus) in enumerate(zip(chunk["name"].astype(str), chunk["focus"].astype(str))):
+            yield AudienceSegment(name=name, share=float(share[j]), focus=focus)
+
+def load_segments(path: str) -> List[AudienceSegment]:
+    """Segments by share, descending; parsed once per file version, like load_topic_store."""
+    sig = _signature(path)
+    cached = _SEGMENTS_CACHE.get(sig)
+    if cached is None:
+        cached = list(iter_segments(path))
+        # sort by share desc, as make_demo_segments does
+        cached.sort(key=lambda x: x.share, reverse=True)
+        for old in [k for k in _SEGMENTS_CACHE if k[0] == sig[0]]:
+            del _SEGMENTS_CACHE[old]
+        _SEGMENTS_CACHE[sig] = cached
+    return [dataclasses.replace(s) for s in cached]
+
+def load_metric_history(path: str, chunksize: int = 200_000) -> MetricSeries:
+    """Per-post / per-hour ER and CTR history; timestamps are parsed as UTC and sorted if needed."""
+    ts, ers, ctrs = [], [], []
+    for chunk in iter_chunks(path, METRIC_COLUMNS, chunksize):
+        when = pd.to_datetime(chunk["timestamp"], utc=True, errors="coerce")
+        if when.isna().any():
+            row = int(chunk.index[int(np.argmax(when.isna().to_numpy()))])
+            raise CatalogError(f"{os.path.basename(path)}: row {row + 1}: bad 'timestamp'")
+        ts.append(when.to_numpy(dtype="datetime64[ns]").astype(np.int64) / 86_400e9)
+        ers.append(_unit_column(chunk, "er", path))
+        ctrs.append(_unit_column(chunk, "ctr", path))
+    if not ts:
+        return MetricSeries()
+    t, er, ctr = np.concatenate(ts), np.concatenate(ers), np.concatenate(ctrs)
+    if np.any(np.diff(t) < 0):
+        order = np.argsort(t, kind="stable")
+        t, er, ctr = t[order], er[order], ctr[order]
+    return MetricSeries(t, er, ctr)
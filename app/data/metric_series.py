@@ -0,0 +1,104 @@
+from __future__ import annotations
+from typing import Optional, Tuple
+
+import numpy as np
+
+class MetricSeries:
+    """Append-only ER/CTR history in growable float64 arrays.
+
+    Time is in matplotlib date units (days since 1970-01-01) and must not
+    decrease, so any time window is found with a binary search.
+    """
+
+    def __init__(self, t: Optional[np.ndarray] = None, er: Optional[np.ndarray] = None,
+                 ctr: Optional[np.ndarray] = None, capacity: int = 1024):
+        t = np.zeros(0) if t is None else np.asarray(t, dtype=np.float64)
+        n = t.size
+        cap = max(capacity, n)
+        self._t = np.empty(cap); self._er = np.empty(cap); self._ctr = np.empty(cap)
+        self._n = 0
+        self.version = 0
+        if n:
+            self.append(t, er, ctr)
+
+    def __len__(self) -> int:
+        return self._n
+
+    @property
+    def t(self) -> np.ndarray:
+        return self._t[:self._n]
+
+    @property
+    def er(self) -> np.ndarray:
+        return self._er[:self._n]
+
+    @property
+    def ctr(self) -> np.ndarray:
+        return self._ctr[:self._n]
+
+    def span(self) -> Tuple[float, float]:
+        return (float(self._t[0]), float(self._t[self._n-1])) if self._n else (0.0, 1.0)
+
+    def append(self, t, er, ctr) -> None:
+        t = np.atleast_1d(np.asarray(t, dtype=np.float64))
+        er = np.atleast_1d(np.asarray(er, dtype=np.float64))
+        ctr = np.atleast_1d(np.asarray(ctr, dtype=np.float64))
+        if not (t.size == er.size == ctr.size):
+            raise ValueError("t, er and ctr must have the same length")
+        if t.size == 0:
+            return
+        if np.any(np.diff(t) < 0) or (self._n and t[0] < self._t[self._n-1]):
+            raise ValueError("metric history must be appended in time order")
+        end = self._n + t.size
+        if end > self._t.size:
+            cap = max(end, 2*self._t.size)
+            for name in ("_t", "_er", "_ctr"):
+                grown = np.empty(cap)
+                grown[:self._n] = getattr(self, name)[:self._n]
+                setattr(self, name, grown)
+        self._t[self._n:end] = t
+        self._er[self._n:end] = er
+        self._ctr[self._n:end] = ctr
+        self._n = end
+        self.version += 1
+
+    def window(self, t0: float, t1: float) -> slice:
+        """Index range covering [t0, t1] plus one point on each side, so lines reach the axes edges."""
+        t = self.t
+        i = max(int(np.searchsorted(t, t0, side="left")) - 1, 0)
+        j = min(int(np.searchsorted(t, t1, side="right")) + 1, self._n)
+        return slice(i, j)
+
+def minmax_decimate(x: np.ndarray, y: np.ndarray, n_buckets: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Keep the min and max of y in each of n_buckets equal index ranges (plus both end points).
+
+    At one bucket per pixel column the plotted line looks the same as the
+    raw one, since every spike still reaches its extreme.
+    """
+    n = x.size
+    if n <= 2*n_buckets + 2:
+        return x, y
+    k = -(-n // n_buckets)  # points per bucket
+    m = -(-n // k)
+    blocks = np.pad(y, (0, m*k - n), mode="edge").reshape(m, k)
+    base = np.arange(m, dtype=np.int64) * k
+    imin = base + blocks.argmin(axis=1)
+    imax = base + blocks.argmax(axis=1)
+    idx = np.empty(2*m + 2, dtype=np.int64)
+    idx[0], idx[-1] = 0, n - 1
+    idx[1:-1:2] = np.minimum(imin, imax)
+    idx[2:-1:2] = np.maximum(imin, imax)
+    idx = np.unique(np.minimum(idx, n - 1))
+    return x[idx], y[idx]
+
+def make_demo_history(days: int = 365, per_day: int = 24, seed: int = 4, end: Optional[np.datetime64] = None) -> MetricSeries:
+    """Hourly ER/CTR random walk ending now, for running without a metrics file."""
+    rng = np.random.default_rng(seed)
+    n = days * per_day
+    end = np.datetime64("now", "s") if end is None else np.datetime64(end, "s")
+    t_end = end.astype(np.int64) / 86400.0
+    t = t_end - (n - 1 - np.arange(n)) / per_day
+    daily = np.sin(2*np.pi*np.arange(n) / per_day)
+    er = np.clip(0.06 + np.cumsum(rng.normal(0.0, 0.0008, n)) * 0.3 + 0.01*daily, 0.03, 0.14)
+    ctr = np.clip(0.035 + np.cumsum(rng.normal(0.0, 0.0005, n)) * 0.3 + 0.006*daily, 0.015, 0.10)
+    return MetricSeries(t, er, ctr)
@@ -0,0 +1,133 @@
+from __future__ import annotations
+from typing import Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+from app.data.sample_data import TopicItem
+
+class TopicView:
+    """Read-only per-topic access into a TopicStore (same fields as TopicItem)."""
+    __slots__ = ("_store", "_i")
+
+    def __init__(self, store: "TopicStore", i: int):
+        self._store = store
+        self._i = i
+
+    @property
+    def topic(self) -> str:
+        return self._store.topics[self._i]
+
+    @property
+    def keywords(self) -> List[str]:
+        return self._store.keywords(self._i)
+
+    @property
+    def base_popularity(self) -> float:
+        return float(self._store.base_popularity[self._i])
+
+    @property
+    def seasonality(self) -> float:
+        return float(self._store.seasonality[self._i])
+
+    @property
+    def novelty(self) -> float:
+        return float(self._store.novelty[self._i])
+
+    def __repr__(self) -> str:
+        return f"TopicView({self._i}, {self.topic!r})"
+
+class TopicStore:
+    """Columnar topic catalog.
+
+    Numeric attributes are contiguous float32 arrays; keywords are int32 ids
+    into a shared vocabulary, laid out CSR-style: the ids of topic i are
+    kw_ids[kw_offsets[i]:kw_offsets[i+1]].
+    """
+
+    def __init__(self, topics: List[str], base_popularity: np.ndarray, seasonality: np.ndarray, novelty: np.ndarray,
+                 vocab: List[str], kw_offsets: np.ndarray, kw_ids: np.ndarray):
+        self.topics = topics
+        self.base_popularity = np.ascontiguousarray(base_popularity, dtype=np.float32)
+        self.seasonality = np.ascontiguousarray(seasonality, dtype=np.float32)
+        self.novelty = np.ascontiguousarray(novelty, dtype=np.float32)
+        self.vocab = vocab
+        self.kw_offsets = np.ascontiguousarray(kw_offsets, dtype=np.int64)
+        self.kw_ids = np.ascontiguousarray(kw_ids, dtype=np.int32)
+        self._texts: Optional[List[str]] = None
+
+    def __len__(self) -> int:
+        return len(self.topics)
+
+    def __getitem__(self, i: int) -> TopicView:
+        if not -len(self) <= i < len(self):
+            raise IndexError(i)
+        return TopicView(self, i % len(self))
+
+    def __iter__(self) -> Iterator[TopicView]:
+        return (TopicView(self, i) for i in range(len(self)))
+
+    def keyword_ids(self, i: int) -> np.ndarray:
+        return self.kw_ids[self.kw_offsets[i]:self.kw_offsets[i+1]]
+
+    def keywords(self, i: int) -> List[str]:
+        return [self.vocab[k] for k in self.keyword_ids(i)]
+
+    def texts(self) -> List[str]:
+        # "topic kw1 kw2 ..." per row, built once per store
+        if self._texts is None:
+            self._texts = [" ".join([t] + self.keywords(i)) for i, t in enumerate(self.topics)]
+        return self._texts
+
+    def nbytes(self) -> int:
+        return sum(a.nbytes for a in (self.base_popularity, self.seasonality, self.novelty, self.kw_offsets, self.kw_ids))
+
+    @classmethod
+    def from_items(cls, items: Sequence[TopicItem]) -> "TopicStore":
+        builder = TopicStoreBuilder()
+        builder.add([t.topic for t in items], [t.keywords for t in items],
+                    np.array([t.base_popularity for t in items], dtype=np.float32),
+                    np.array([t.seasonality for t in items], dtype=np.float32),
+                    np.array([t.novelty for t in items], dtype=np.float32))
+        return builder.build()
+
+class TopicStoreBuilder:
+    """Accumulates chunks of topics, interning keywords as it goes."""
+
+    def __init__(self):
+        self.topics: List[str] = []
+        self.numeric: Dict[str, List[np.ndarray]] = {"base_popularity": [], "seasonality": [], "novelty": []}
+        self.vocab: List[str] = []
+        self.index: Dict[str, int] = {}
+        self.lengths: List[np.ndarray] = []
+        self.ids: List[np.ndarray] = []
+
+    def _intern(self, kw: str) -> int:
+        k = self.index.get(kw)
+        if k is None:
+            k = self.index[kw] = len(self.vocab)
+            self.vocab.append(kw)
+        return k
+
+    def add(self, topics: List[str], keywords: List[List[str]], base: np.ndarray, season: np.ndarray, nov: np.ndarray) -> None:
+        self.topics.extend(topics)
+        self.lengths.append(np.fromiter((len(kws) for kws in keywords), dtype=np.int64, count=len(keywords)))
+        self.ids.append(np.fromiter((self._intern(k) for kws in keywords for k in kws), dtype=np.int32))
+        self.numeric["base_popularity"].append(np.asarray(base, dtype=np.float32))
+        self.numeric["seasonality"].append(np.asarray(season, dtype=np.float32))
+        self.numeric["novelty"].append(np.asarray(nov, dtype=np.float32))
+
+    def build(self) -> TopicStore:
+        def cat(parts: List[np.ndarray], dtype) -> np.ndarray:
+            return np.concatenate(parts).astype(dtype, copy=False) if parts else np.zeros(0, dtype=dtype)
+        lengths = cat(self.lengths, np.int64)
+        offsets = np.zeros(lengths.size + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        return TopicStore(
+            topics=self.topics,
+            base_popularity=cat(self.numeric["base_popularity"], np.float32),
+            seasonality=cat(self.numeric["seasonality"], np.float32),
+            novelty=cat(self.numeric["novelty"], np.float32),
+            vocab=self.vocab,
+            kw_offsets=offsets,
+            kw_ids=cat(self.ids, np.int32),
+        )
@@ -2,28 +2,45 @@ from __future__ import annotations
 import os
 import sys
 
-from PyQt6.QtWidgets import QApplication, QStackedWidget
-from app.ui.login_page import LoginPage
-from app.ui.main_window import MainWindow
+from app.startup import STARTUP, prewarm
+
+# Only PyQt6 and the login page are imported up front; the dashboard stack
+# (pandas, scikit-learn, matplotlib, reportlab) is pre-warmed after the first frame.
+with STARTUP.phase("import PyQt6"):
+    from PyQt6.QtCore import QTimer
+    from PyQt6.QtWidgets import QApplication, QStackedWidget
+with STARTUP.phase("import app.ui.login_page"):
+    from app.ui.login_page import LoginPage
 
 def resource_path(*parts: str) -> str:
     here = os.path.dirname(os.path.abspath(__file__))
     return os.path.join(here, *parts)
 
 def main():
-    app = QApplication(sys.argv)
+    with STARTUP.phase("QApplication"):
+        app = QApplication(sys.argv)
 
     qss_path = resource_path("assets", "style.qss")
     reports_dir = resource_path("reports")
+    models_dir = resource_path("models")
+    # optional real catalogs (CSV / JSONL / Parquet); demo data otherwise
+    catalog_path = os.environ.get("APP_TOPICS_CATALOG") or None
+    segments_path = os.environ.get("APP_SEGMENTS_CATALOG") or None
+    history_path = os.environ.get("APP_METRICS_HISTORY") or None  # timestamp, er, ctr
 
     stack = QStackedWidget()
     stack.setWindowTitle("Рекомендаційна система тем контенту (PyQt6)")
     stack.resize(1280, 780)
 
-    login = LoginPage()
+    with STARTUP.phase("LoginPage()"):
+        login = LoginPage()
 
     def on_login(user_name: str):
-        mw = MainWindow(user_name=user_name, qss_path=qss_path, reports_dir=reports_dir)
+        with STARTUP.phase("import app.ui.main_window (wait for pre-warm)"):
+            from app.ui.main_window import MainWindow
+        with STARTUP.phase("MainWindow()"):
+            mw = MainWindow(user_name=user_name, qss_path=qss_path, reports_dir=reports_dir, models_dir=models_dir,
+                            catalog_path=catalog_path, segments_path=segments_path, history_path=history_path)
         stack.addWidget(mw)
         stack.setCurrentWidget(mw)
 
@@ -32,6 +49,12 @@ def main():
     stack.setCurrentWidget(login)
     stack.show()
 
+    def on_first_frame():
+        STARTUP.mark("first login frame")
+        prewarm()
+
+    QTimer.singleShot(0, on_first_frame)
+
     sys.exit(app.exec())
 
 if __name__ == "__main__":
@@ -0,0 +1,100 @@
+from __future__ import annotations
+import os
+import glob
+import json
+import hashlib
+import threading
+from typing import Any, Optional
+
+try:
+    import joblib
+except Exception:  # pragma: no cover
+    joblib = None
+
+# Bump when the feature layout or model classes change so stale artifacts are ignored
+MODEL_VERSION = "1"
+
+def artifact_key(seed: int, **inputs: Any) -> str:
+    payload = json.dumps({"version": MODEL_VERSION, "seed": seed, **inputs}, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:16]
+
+class ModelStore:
+    """Fitted model artifacts on disk, one file per (name, key).
+
+    Artifacts are written uncompressed so that numpy arrays inside them
+    (tree node tables, cluster centers) are memory-mapped on load. Up to
+    keep artifacts per name are kept (engines with other seeds or catalogs
+    may share the directory); the least recently used go first.
+    """
+
+    def __init__(self, root: str, keep: int = 4):
+        self.root = root
+        self.keep = keep
+        os.makedirs(self.root, exist_ok=True)
+
+    @staticmethod
+    def available() -> bool:
+        return joblib is not None
+
+    def path(self, name: str, key: str) -> str:
+        return os.path.join(self.root, f"{name}-v{MODEL_VERSION}-{key}.joblib")
+
+    def load(self, name: str, key: str, mmap: bool = True) -> Optional[Any]:
+        path = self.path(name, key)
+        if joblib is None or not os.path.exists(path):
+            return None
+        try:
+            # mmap=False for artifacts that are updated in place after loading
+            obj = joblib.load(path, mmap_mode="r" if mmap else None)
+        except Exception:
+            # corrupted / incompatible artifact: treat as missing, caller retrains
+            return None
+        try:
+            os.utime(path)  # mtime is the last use, for eviction
+        except OSError:
+            pass
+        return obj
+
+    def save(self, name: str, key: str, obj: Any) -> Optional[str]:
+        if joblib is None:
+            return None
+        path = self.path(name, key)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        joblib.dump(obj, tmp)
+        os.replace(tmp, path)
+        self._drop_others(name, path)
+        return path
+
+    def save_pickled(self, name: str, key: str, blob: bytes) -> Optional[str]:
+        """Write an object already serialized with pickle.dumps (joblib.load reads it back).
+
+        Lets callers pickle a shared object while holding its lock and do the
+        disk write after releasing it.
+        """
+        if joblib is None:
+            return None
+        path = self.path(name, key)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(blob)
+        os.replace(tmp, path)
+        self._drop_others(name, path)
+        return path
+
+    def _drop_others(self, name: str, path: str) -> None:
+        # artifacts of older MODEL_VERSIONs always go; of the current one, all but the keep most recent
+        current = glob.glob(os.path.join(self.root, f"{name}-v{MODEL_VERSION}-*.joblib"))
+        stale = set(glob.glob(os.path.join(self.root, f"{name}-v*.joblib"))) - set(current)
+
+        def mtime(p: str) -> float:
+            try:
+                return os.path.getmtime(p)
+            except OSError:
+                return 0.0
+
+        current.sort(key=lambda p: (p == path, mtime(p)), reverse=True)
+        for old in list(stale) + current[self.keep:]:
+            try:
+                os.remove(old)
+            except OSError:
+                pass
@@ -0,0 +1,185 @@
+from __future__ import annotations
+import os
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.units import cm
+from reportlab.lib.utils import simpleSplit
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.pdfgen import canvas
+
+# (header, relative width)
+PdfColumn = Tuple[str, float]
+
+_FONTS: Optional[Tuple[str, str]] = None
+
+def pdf_fonts() -> Tuple[str, str]:
+    """(regular, bold) font names; DejaVu Sans (shipped with matplotlib) covers Cyrillic, Helvetica does not."""
+    global _FONTS
+    if _FONTS is None:
+        try:
+            import matplotlib
+            ttf = os.path.join(matplotlib.get_data_path(), "fonts", "ttf")
+            pdfmetrics.registerFont(TTFont("DejaVuSans", os.path.join(ttf, "DejaVuSans.ttf")))
+            pdfmetrics.registerFont(TTFont("DejaVuSans-Bold", os.path.join(ttf, "DejaVuSans-Bold.ttf")))
+            _FONTS = ("DejaVuSans", "DejaVuSans-Bold")
+        except Exception:
+            _FONTS = ("Helvetica", "Helvetica-Bold")
+    return _FONTS
+
+class PdfTableWriter:
+    """Lays a report out page by page as rows arrive.
+
+    Table rows are consumed lazily from any iterable: every cell is wrapped
+    to its column width, and a row that does not fit starts a new page with
+    the header repeated. Memory is not flat, though: reportlab keeps the
+    content of every page until save() (about 0.9 KB per table row, 7 MB
+    at 8k rows and 29 MB at 32k), so large tables belong in CSV / Parquet.
+    """
+
+    def __init__(self, path: str, title: str = "", pagesize=A4, margin: float = 2*cm, font_size: float = 9,
+                 progress: Optional[Callable[[int], None]] = None, progress_every: int = 500):
+        # invariant: identical input gives a byte-identical file, so duplicates can be detected by hash
+        self.c = canvas.Canvas(path, pagesize=pagesize, pageCompression=1, invariant=1)
+        if title:
+            self.c.setTitle(title)
+        self.width, self.height = pagesize
+        self.margin = margin
+        self.font, self.bold = pdf_fonts()
+        self.font_size = font_size
+        self.leading = font_size * 1.25
+        self.y = self.height - margin
+        self.rows_written = 0
+        self.progress = progress
+        self.progress_every = progress_every
+
+    def __enter__(self) -> "PdfTableWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+
+    @property
+    def text_width(self) -> float:
+        return self.width - 2*self.margin
+
+    def _new_page(self) -> None:
+        self.c.showPage()
+        self.y = self.height - self.margin
+
+    def page_break(self) -> None:
+        if self.y < self.height - self.margin:
+            self._new_page()
+
+    def _ensure(self, h: float) -> bool:
+        """Start a new page unless h fits; True if a page was started."""
+        if self.y - h < self.margin:
+            self._new_page()
+            return True
+        return False
+
+    def heading(self, text: str, size: float = 12, space_after: float = 6) -> None:
+        self.paragraph(text, size=size, bold=True, space_after=space_after)
+
+    def paragraph(self, text: str, size: Optional[float] = None, bold: bool = False,
+                  color: Tuple[float, float, float] = (0, 0, 0), space_after: float = 4) -> None:
+        size = size or self.font_size + 1
+        font = self.bold if bold else self.font
+        leading = size * 1.25
+        self.c.setFillColorRGB(*color)
+        self.c.setFont(font, size)
+        for ln in simpleSplit(text, font, size, self.text_width) or [""]:
+            self._ensure(leading)
+            self.y -= size
+            self.c.drawString(self.margin, self.y, ln)
+            self.y -= leading - size
+        self.c.setFillColorRGB(0, 0, 0)
+        self.y -= space_after
+
+    def table(self, columns: Sequence[PdfColumn], rows: Iterable[Sequence[object]], pad: float = 3) -> int:
+        """Write rows (consumed lazily) as a wrapped grid table; returns the number of rows."""
+        total = sum(w for _, w in columns)
+        widths = [self.text_width * w / total for _, w in columns]
+        xs = [self.margin]
+        for w in widths:
+            xs.append(xs[-1] + w)
+        max_lines = max(int((self.height - 2*self.margin - 2*pad) / self.leading) - 4, 1)
+
+        # repeated cell values (status, trend, ...) are measured once
+        wrapped: Dict[Tuple[str, str, int], List[str]] = {}
+
+        def wrap(values: Sequence[object], font: str) -> List[List[str]]:
+            out = []
+            for j, (v, w) in enumerate(zip(values, widths)):
+                text = "" if v is None else str(v)
+                key = (font, text, j)
+                lines = wrapped.get(key)
+                if lines is None:
+                    lines = simpleSplit(text, font, self.font_size, w - 2*pad) or [""]
+                    if len(lines) > max_lines:  # a single row never spans more than a page
+                        lines = lines[:max_lines-1] + [lines[max_lines-1] + " …"]
+                    if len(wrapped) > 4096:
+                        wrapped.clear()
+                    wrapped[key] = lines
+                out.append(lines)
+            return out
+
+        header = wrap([h for h, _ in columns], self.bold)
+        header_h = max(len(c) for c in header) * self.leading + 2*pad
+
+        def draw_row(cells: List[List[str]], h: float, font: str, fill: Optional[Tuple[float, float, float]]) -> None:
+            c = self.c
+            top = self.y
+            if fill is not None:
+                c.setFillColorRGB(*fill)
+                c.rect(self.margin, top - h, self.text_width, h, stroke=0, fill=1)
+                c.setFillColorRGB(0, 0, 0)
+            # one text object per row rather than one per line
+            text = c.beginText()
+            text.setFont(font, self.font_size, self.leading)
+            for x, lines in zip(xs, cells):
+                text.setTextOrigin(x + pad, top - pad - self.font_size)
+                text.textLines(lines)
+            c.drawText(text)
+            c.setStrokeColorRGB(0.84, 0.89, 0.96)
+            c.line(self.margin, top - h, self.margin + self.text_width, top - h)
+            if fill is not None:
+                c.line(self.margin, top, self.margin + self.text_width, top)
+            c.setStrokeColorRGB(0, 0, 0)
+            self.y = top - h
+
+        def close_grid(top: float) -> None:
+            # column rules are drawn once per page, not once per row
+            c = self.c
+            c.setStrokeColorRGB(0.84, 0.89, 0.96)
+            for x in xs:
+                c.line(x, top, x, self.y)
+            c.setStrokeColorRGB(0, 0, 0)
+
+        self._ensure(header_h + self.leading + 2*pad)
+        grid_top = self.y
+        draw_row(header, header_h, self.bold, (0.93, 0.95, 0.99))
+        n = 0
+        for values in rows:
+            cells = wrap(values, self.font)
+            h = max(len(c) for c in cells) * self.leading + 2*pad
+            if self.y - h < self.margin:
+                close_grid(grid_top)
+                self._new_page()
+                grid_top = self.y
+                draw_row(header, header_h, self.bold, (0.93, 0.95, 0.99))
+            draw_row(cells, h, self.font, None)
+            n += 1
+            self.rows_written += 1
+            if self.progress is not None and self.rows_written % self.progress_every == 0:
+                self.progress(self.rows_written)
+        close_grid(grid_top)
+        self.y -= self.leading
+        return n
+
+    def close(self) -> None:
+        self.c.save()
+        if self.progress is not None:
+            self.progress(self.rows_written)
@@ -1,20 +1,26 @@
 from __future__ import annotations
-import random
-from dataclasses import dataclass
-from typing import List, Dict, Tuple, Optional
+import copy
+import dataclasses
+import os
+import pickle
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, List, Dict, Tuple, Optional
 
 import numpy as np
 
 try:
-    from sklearn.feature_extraction.text import TfidfVectorizer
-    from sklearn.cluster import KMeans
     from sklearn.ensemble import RandomForestRegressor
 except Exception:  # pragma: no cover
-    TfidfVectorizer = None
-    KMeans = None
     RandomForestRegressor = None
 
-from app.data.sample_data import TopicItem, make_demo_topics
+from app.data.sample_data import make_demo_topics
+from app.data.catalog_loader import load_topic_store
+from app.data.topic_store import TopicStore
+from app.services.forest_inference import FlatForest
+from app.services.model_store import ModelStore, artifact_key
+from app.services.text_features import TextFeaturePipeline
 
 @dataclass
 class TopicRec:
@@ -27,167 +33,419 @@ class TopicRec:
     status: str  # "кандидат" / "резерв" / "перегляд"
     ctr_pred: float
 
-def _clamp(x: float, a: float = 0.0, b: float = 1.0) -> float:
-    return max(a, min(b, x))
+def _trend_labels(deltas: np.ndarray) -> np.ndarray:
+    # weekly trend change above +3% / below -3%
+    return np.select([deltas > 0.03, deltas < -0.03], ["зростає", "спадає"], default="стабільно")
+
+def _statuses_by_score(scores: np.ndarray) -> np.ndarray:
+    # score thresholds: candidate >= 0.70, reserve >= 0.55, otherwise review
+    return np.select([scores >= 0.70, scores >= 0.55], ["кандидат", "резерв"], default="перегляд")
+
+def _top_terms_per_row(X: Any, k: int) -> List[np.ndarray]:
+    # Column ids of the k largest values in each row of a CSR matrix, read from X.data directly
+    n = X.shape[0]
+    lengths = np.diff(X.indptr)
+    row_of = np.repeat(np.arange(n), lengths)
+    order = np.lexsort((X.indices, -X.data, row_of))  # by row, then value desc (ties by column)
+    rank = np.arange(order.size) - X.indptr[row_of[order]]
+    keep = order[(rank < k) & (X.data[order] > 0)]
+    counts = np.bincount(row_of[keep], minlength=n)
+    return np.split(X.indices[keep], np.cumsum(counts)[:-1])
+
+def _top_k_indices(values: np.ndarray, k: int) -> np.ndarray:
+    # Indices of the k largest values, descending, ties in index order (as a stable sort of all);
+    # O(n) partition, then only the values at or above the k-th are sorted
+    k = max(0, min(k, values.size))
+    if k == 0:
+        return np.zeros(0, dtype=np.int64)
+    kth = values[np.argpartition(-values, k - 1)[k - 1]]
+    cand = np.flatnonzero(values >= kth)  # every value tied with the k-th, in index order
+    return cand[np.argsort(-values[cand], kind="stable")][:k]
+
+def synthetic_training_set(cat: TopicStore, n: int, seed: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(X, y_er, y_ctr) drawn from the catalog in one vectorized pass.
+
+    Features: [base_popularity, seasonality, novelty, trend_boost, cluster_id];
+    targets follow a latent "quality" of the topic plus noise.
+    """
+    rng = np.random.default_rng(seed)
+    t = rng.integers(0, len(cat), n)
+    cluster_id = rng.integers(0, 4, n).astype(float)
+    trend_boost = rng.uniform(-0.08, 0.10, n)
+    base = cat.base_popularity[t].astype(float)
+    season = cat.seasonality[t].astype(float)
+    nov = cat.novelty[t].astype(float)
+
+    quality = 0.45*base + 0.25*nov + 0.20*season + 0.10*(cluster_id/3.0)
+    er = np.clip(0.04 + 0.14*quality + trend_boost + rng.normal(0, 0.015, n), 0.02, 0.16)
+    ctr = np.clip(0.02 + 0.10*(0.55*base + 0.25*season + 0.20*nov) + 0.6*trend_boost + rng.normal(0, 0.012, n), 0.01, 0.14)
+    return np.column_stack([base, season, nov, trend_boost, cluster_id]), er, ctr
+
+# Up to this many rows the flattened forests are faster than sklearn's per-tree predict();
+# beyond it the lock-step numpy walk costs more than the compiled one
+FLAT_PREDICT_MAX_ROWS = 4096
+
+PLATFORMS = ("усі", "Instagram", "TikTok", "YouTube")
+HORIZONS = (7, 14, 30)  # days; the grid scored for every snapshot
+
+# platform -> (shift of [base_popularity, seasonality, novelty], ER multiplier, CTR multiplier)
+PLATFORM_PROFILES: Dict[str, Tuple[Tuple[float, float, float], float, float]] = {
+    "усі": ((0.0, 0.0, 0.0), 1.00, 1.00),
+    "Instagram": ((0.0, 0.05, 0.0), 1.05, 0.95),    # seasonal, visual content
+    "TikTok": ((-0.05, 0.0, 0.10), 1.15, 0.90),     # novelty first, high engagement
+    "YouTube": ((0.05, 0.0, -0.05), 0.90, 1.10),    # evergreen topics, search-driven clicks
+}
 
-def _trend_label(delta: float) -> str:
-    if delta > 0.03:
-        return "зростає"
-    if delta < -0.03:
-        return "спадає"
-    return "стабільно"
-
-def _status_by_score(score: float) -> str:
-    if score >= 0.70:
-        return "кандидат"
-    if score >= 0.55:
-        return "резерв"
-    return "перегляд"
+@dataclass
+class _Slice:
+    er: np.ndarray
+    ctr: np.ndarray
+    trend: np.ndarray  # trend boost over the horizon
+
+@dataclass(eq=False)
+class _CatalogSnapshot:
+    # One refresh worth of inputs, derived from its seed, plus everything scored from them
+    seed: int
+    cat: TopicStore
+    deltas: np.ndarray
+    clusters: np.ndarray
+    Xtxt: Optional[Any]
+    docs: Optional[list]  # the text pipeline's (columns, counts, terms) per topic
+    version: int = -1  # model version the slices were scored with
+    filling: int = -1  # model version the rest of the grid is being scored with in the background
+    slices: Dict[Tuple[str, int], _Slice] = field(default_factory=dict)
+    recs: Dict[Tuple[str, int, int], Tuple[List[TopicRec], Dict[str, float]]] = field(default_factory=dict)
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+@dataclass(frozen=True)
+class _Predictors:
+    # Fitted forests and what is derived from them; replaced as a whole, never modified,
+    # so a request keeps one consistent set even while the models are being extended
+    version: int
+    er_model: Any
+    ctr_model: Any
+    flat: Optional[FlatForest]
+    key_factor: Optional[str]
+
+_FACTOR_LABELS = ["популярність", "сезонність", "новизна", "тренд", "сегмент"]
 
 class RecommenderEngine:
+    """Scores a topic catalog with the ER/CTR forests.
+
+    recommend() is a function of its arguments (seed, platform, horizon,
+    top_k) and the fitted models only: equal calls return equal results,
+    whatever ran before, and the engine can serve several threads at once.
+    """
+
+    MAX_SNAPSHOTS = 8
 
-    def __init__(self, seed: int = 42):
+    def __init__(self, seed: int = 42, models_dir: Optional[str] = None, catalog_path: Optional[str] = None,
+                 n_jobs: int = -1):
         self.seed = seed
-        self.rng = random.Random(seed)
+        self.n_jobs = n_jobs  # cores used to grow trees; prediction stays single-threaded
+        self.catalog_path = catalog_path
+        self.store = ModelStore(models_dir) if models_dir and ModelStore.available() else None
+        self._predictors: Optional[_Predictors] = None
+        self._snapshots: "OrderedDict[int, _CatalogSnapshot]" = OrderedDict()
+        self._text_lock = threading.Lock()  # the text pipeline is updated in place
+        self._save_lock = threading.Lock()
+        self._text_generation = self._text_saved = 0
+        self._fit_lock = threading.Lock()
+        self._last_scored: Optional[_CatalogSnapshot] = None
         self._init_models()
 
-    def _init_models(self) -> None:
-        # TF-IDF + KMeans
-        if TfidfVectorizer is not None:
-            self.vectorizer = TfidfVectorizer(ngram_range=(1,2))
-        else:
-            self.vectorizer = None
+    @property
+    def er_model(self) -> Any:
+        return self._predictors.er_model if self._predictors is not None else None
 
-        self.kmeans = KMeans(n_clusters=4, random_state=self.seed, n_init=10) if KMeans is not None else None
-
-        # Regressors
-        self.er_model = RandomForestRegressor(
-            n_estimators=200, random_state=self.seed, max_depth=6
-        ) if RandomForestRegressor is not None else None
-        self.ctr_model = RandomForestRegressor(
-            n_estimators=200, random_state=self.seed + 1, max_depth=6
-        ) if RandomForestRegressor is not None else None
+    @property
+    def ctr_model(self) -> Any:
+        return self._predictors.ctr_model if self._predictors is not None else None
 
-        self._fit_synthetic_predictors()
+    @property
+    def model_version(self) -> int:
+        # bumped on every fit/load; scored snapshots belong to one version
+        return self._predictors.version if self._predictors is not None else 0
 
-    def _fit_synthetic_predictors(self) -> None:
-        # Build synthetic dataset where features roughly map to ER/CTR.
-        # Features: [base_popularity, seasonality, novelty, trend_boost, cluster_id]
-        X, y_er, y_ctr = [], [], []
-        topics = make_demo_topics(seed=7)
-        for i in range(600):
-            t = self.rng.choice(topics)
-            cluster_id = self.rng.randrange(4)
-            trend_boost = self.rng.uniform(-0.08, 0.10)
-            base = t.base_popularity
-            season = t.seasonality
-            nov = t.novelty
-
-            # latent "quality" + noise
-            quality = 0.45*base + 0.25*nov + 0.20*season + 0.10*(cluster_id/3.0)
-            er = _clamp(0.04 + 0.14*quality + trend_boost + self.rng.gauss(0, 0.015), 0.02, 0.16)
-            ctr = _clamp(0.02 + 0.10*(0.55*base + 0.25*season + 0.20*nov) + 0.6*trend_boost + self.rng.gauss(0, 0.012), 0.01, 0.14)
-
-            X.append([base, season, nov, trend_boost, cluster_id])
-            y_er.append(er)
-            y_ctr.append(ctr)
+    def _init_models(self) -> None:
+        # Incremental TF-IDF + online KMeans (state survives restarts via the store)
+        self.text = None
+        if TextFeaturePipeline.available():
+            # one artifact per catalog: the hash space is sized from the catalog it was first fitted on
+            catalog = os.path.abspath(self.catalog_path) if self.catalog_path else "demo"
+            self._text_key = artifact_key(self.seed, kind="text", n_clusters=4, n_features="auto", catalog=catalog,
+                                          docs="with-terms")
+            cached = self.store.load("text", self._text_key, mmap=False) if self.store is not None else None
+            self.text = cached if cached is not None else TextFeaturePipeline(n_clusters=4, seed=self.seed)
 
-        X = np.asarray(X, dtype=float)
-        y_er = np.asarray(y_er, dtype=float)
-        y_ctr = np.asarray(y_ctr, dtype=float)
-
-        if self.er_model is not None:
-            self.er_model.fit(X, y_er)
-        if self.ctr_model is not None:
-            self.ctr_model.fit(X, y_ctr)
-
-    def recommend(self, horizon_days: int = 7, platform: str = "усі", top_k: int = 6) -> Tuple[List[TopicRec], Dict[str, float]]:
-        topics = make_demo_topics(seed=7 + self.rng.randrange(0, 10_000))
-        # Prepare text for clustering
-        texts = [" ".join([t.topic] + t.keywords) for t in topics]
-
-        if self.vectorizer is not None and self.kmeans is not None:
-            Xtxt = self.vectorizer.fit_transform(texts)
-            clusters = self.kmeans.fit_predict(Xtxt)
-            feature_names = np.array(self.vectorizer.get_feature_names_out())
+        # Regressors
+        if RandomForestRegressor is None:
+            return
+
+        self._predictors_key = artifact_key(self.seed, kind="predictors", samples=600, n_estimators=200, max_depth=6,
+                                            catalog_seed=7, sampler="numpy")
+        cached = self.store.load("predictors", self._predictors_key) if self.store is not None else None
+        if cached is not None:
+            self._publish(*cached, save=False)
         else:
-            clusters = np.array([self.rng.randrange(4) for _ in topics])
-            feature_names = None
-
-        # Simulate weekly trend change
-        deltas = [self.rng.uniform(-0.06, 0.08) for _ in topics]
-
-        recs: List[TopicRec] = []
-        for i, t in enumerate(topics):
-            cluster_id = int(clusters[i])
-            trend_boost = float(deltas[i])
-            trend = _trend_label(trend_boost)
-
-            feat = np.array([[t.base_popularity, t.seasonality, t.novelty, trend_boost, cluster_id]], dtype=float)
-
-            if self.er_model is not None:
-                er = float(self.er_model.predict(feat)[0])
-            else:
-                er = float(_clamp(0.06 + 0.06*t.base_popularity + 0.04*t.novelty + trend_boost, 0.02, 0.16))
-
-            if self.ctr_model is not None:
-                ctr = float(self.ctr_model.predict(feat)[0])
+            self._publish(*self._fit_synthetic_predictors(), save=True)
+
+    def _publish(self, er_model: Any, ctr_model: Any, save: bool) -> None:
+        # Derived from the fitted forests: recompute after every fit/load
+        try:
+            flat = FlatForest.from_sklearn([er_model, ctr_model])
+        except ValueError:
+            flat = None
+        models = _Predictors(self.model_version + 1, er_model, ctr_model, flat, self._key_factor_label(er_model))
+        self._predictors = models
+        if save and self.store is not None:
+            self.store.save("predictors", self._predictors_key, (er_model, ctr_model))
+
+    @staticmethod
+    def _key_factor_label(er_model: Any) -> Optional[str]:
+        # Constant per fitted model: recompute only after fit/load
+        fi = getattr(er_model, "feature_importances_", None)
+        if fi is None:
+            return None
+        # map: 0 base,1 season,2 novelty,3 trend_boost,4 cluster_id
+        return _FACTOR_LABELS[int(np.argmax(fi))]
+
+    def _fit_synthetic_predictors(self) -> Tuple[Any, Any]:
+        er_model = RandomForestRegressor(n_estimators=200, random_state=self.seed, max_depth=6)
+        ctr_model = RandomForestRegressor(n_estimators=200, random_state=self.seed + 1, max_depth=6)
+        X, y_er, y_ctr = synthetic_training_set(TopicStore.from_items(make_demo_topics(seed=7)), 600, self.seed)
+        self._fit_forests((er_model, ctr_model), X, y_er, y_ctr)
+        return er_model, ctr_model
+
+    def _fit_forests(self, models: Tuple[Any, Any], X: np.ndarray, y_er: np.ndarray, y_ctr: np.ndarray) -> None:
+        # Trees are grown on all cores; n_jobs is reset afterwards because thread
+        # dispatch costs more than it saves when predicting small batches
+        for model, y in zip(models, (y_er, y_ctr)):
+            model.set_params(n_jobs=self.n_jobs)
+            model.fit(X, y)
+            model.set_params(n_jobs=None, warm_start=False)
+
+    def extend_predictors(self, X: np.ndarray, y_er: np.ndarray, y_ctr: np.ndarray, n_trees: int = 50) -> None:
+        """Grow n_trees more trees per forest on new data, keeping the fitted ones (warm start).
+
+        The extended forests replace the stored artifact, so they survive restarts.
+        """
+        X = np.asarray(X, dtype=float)
+        if X.ndim != 2 or X.shape[1] != 5 or not (len(X) == len(y_er) == len(y_ctr)):
+            raise ValueError("X must be (n, 5) with one ER and one CTR target per row")
+        with self._fit_lock:
+            current = self._predictors
+            if current is None:
+                raise RuntimeError("scikit-learn is not available")
+            # grown on copies: requests already running keep scoring with the current forests
+            models = (copy.deepcopy(current.er_model), copy.deepcopy(current.ctr_model))
+            for model in models:
+                model.set_params(warm_start=True, n_estimators=len(model.estimators_) + n_trees)
+            self._fit_forests(models, X, np.asarray(y_er, dtype=float), np.asarray(y_ctr, dtype=float))
+            self._publish(*models, save=True)
+
+    def snapshot(self, seed: Optional[int] = None) -> _CatalogSnapshot:
+        """Catalog, trend deltas and clusters for one refresh, derived from seed (default: the engine seed).
+
+        The last MAX_SNAPSHOTS are kept, so asking again for a seed returns
+        the same snapshot together with everything already scored from it.
+        """
+        seed = self.seed if seed is None else int(seed)
+        with self._text_lock:
+            snap = self._snapshots.get(seed)
+            if snap is not None:
+                self._snapshots.move_to_end(seed)
+                return snap
+            cat = self._catalog(seed)
+            n = len(cat)
+            rng = np.random.default_rng(seed)
+            # Simulate weekly trend change
+            deltas = rng.uniform(-0.06, 0.08, n)
+
+            blob = None
+            if self.text is not None:
+                Xtxt, clusters = self.text.update(cat.texts())
+                docs = self.text.documents()
+                if self.text.changed and self.store is not None:
+                    # serialized here, written to disk after the lock is released
+                    blob = pickle.dumps(self.text, protocol=pickle.HIGHEST_PROTOCOL)
+                    self._text_generation += 1
+                    generation = self._text_generation
             else:
-                ctr = float(_clamp(0.04 + 0.05*t.base_popularity + 0.03*t.seasonality + 0.6*trend_boost, 0.01, 0.14))
-
-            score = 0.65*(er/0.16) + 0.35*(ctr/0.14)
-            status = _status_by_score(score)
-
-            drivers = ", ".join(t.keywords[:3])
-
-            explain = self._explain_topic(i, t, clusters, feature_names)
+                clusters = rng.integers(0, 4, n)
+                Xtxt = docs = None
+
+            snap = _CatalogSnapshot(seed, cat, deltas, clusters, Xtxt, docs)
+            self._snapshots[seed] = snap
+            while len(self._snapshots) > self.MAX_SNAPSHOTS:
+                self._snapshots.popitem(last=False)
+        if blob is not None:
+            self._save_text(blob, generation)
+        return snap
+
+    def _save_text(self, blob: bytes, generation: int) -> None:
+        with self._save_lock:
+            if generation > self._text_saved:  # a newer state may already be on disk
+                self.store.save_pickled("text", self._text_key, blob)
+                self._text_saved = generation
+
+    def recommend(self, horizon_days: int = 7, platform: str = "усі", top_k: int = 6,
+                  seed: Optional[int] = None) -> Tuple[List[TopicRec], Dict[str, float]]:
+        """Top topics for one platform and horizon of the snapshot for seed.
+
+        Only the requested slice is scored before returning; the rest of the
+        platform × horizon grid follows on a background thread, so switching
+        platform or horizon is then a lookup. A new seed means new data.
+        """
+        if platform not in PLATFORM_PROFILES:
+            raise ValueError(f"Unknown platform: {platform}")
+        return self.score(self.snapshot(seed), horizon_days, platform, top_k)
+
+    def score(self, snap: _CatalogSnapshot, horizon_days: int = 7, platform: str = "усі",
+              top_k: int = 6) -> Tuple[List[TopicRec], Dict[str, float]]:
+        models = self._predictors
+        version = models.version if models is not None else 0
+        horizon_days = int(horizon_days)
+        self._last_scored = snap
+        # one request per snapshot at a time: a concurrent one waits and then finds the result cached
+        with snap.lock:
+            if snap.version != version:
+                snap.slices.clear(); snap.recs.clear()
+                snap.version = version
+            key = (platform, horizon_days, top_k)
+            if key not in snap.recs:
+                if (platform, horizon_days) not in snap.slices:
+                    snap.slices.update(self._score_slices(snap, (platform,), (horizon_days,), models))
+                snap.recs[key] = self._build_recs(snap, snap.slices[(platform, horizon_days)], top_k, models)
+            recs, kpi = snap.recs[key]
+            fill = horizon_days in HORIZONS and snap.filling != version
+            if fill:
+                snap.filling = version
+        if fill:
+            threading.Thread(target=self._fill_grid, args=(snap, models, version), name="score-grid",
+                             daemon=True).start()
+        return [dataclasses.replace(r) for r in recs], dict(kpi)
+
+    def _fill_grid(self, snap: _CatalogSnapshot, models: Optional[_Predictors], version: int) -> None:
+        # Scored outside the lock, so a request for another slice never waits for this one;
+        # a request for a newer snapshot stops the fill (its own grid matters more)
+        for p in PLATFORMS:
+            for h in HORIZONS:
+                if self._last_scored is not snap or snap.version != version:
+                    with snap.lock:
+                        if snap.filling == version:
+                            snap.filling = -1  # the next request for this snapshot restarts the fill
+                    return
+                if (p, h) in snap.slices:
+                    continue
+                sl = self._score_slices(snap, (p,), (h,), models)
+                with snap.lock:
+                    if snap.version == version:
+                        for k, v in sl.items():
+                            snap.slices.setdefault(k, v)
+
+    def _score_slices(self, snap: _CatalogSnapshot, platforms: Tuple[str, ...], horizons: Tuple[int, ...],
+                      models: Optional[_Predictors]) -> Dict[Tuple[str, int], _Slice]:
+        # Features of every (platform, horizon, topic) stacked into one (P*H*n, 5) batch
+        n = len(snap.cat)
+        base = self._feature_matrix(snap.cat, snap.deltas, snap.clusters)
+        shifts = np.array([PLATFORM_PROFILES[p][0] for p in platforms])              # (P, 3)
+        scale = np.sqrt(np.asarray(horizons, dtype=float) / 7.0)                     # (H,)
+        feats = np.broadcast_to(base, (len(platforms), len(horizons), n, 5)).copy()
+        feats[..., :3] = np.clip(feats[..., :3] + shifts[:, None, None, :], 0.0, 1.0)
+        # the trend keeps moving over longer horizons; kept within the range the models were trained on
+        feats[..., 3] = np.clip(snap.deltas[None, None, :] * scale[None, :, None], -0.08, 0.10)
+        er, ctr = self._predict_batch(feats.reshape(-1, 5), models)
+        er, ctr = er.reshape(feats.shape[:3]), ctr.reshape(feats.shape[:3])
+        er_mult = np.array([PLATFORM_PROFILES[p][1] for p in platforms])[:, None, None]
+        ctr_mult = np.array([PLATFORM_PROFILES[p][2] for p in platforms])[:, None, None]
+        er = np.clip(er * er_mult, 0.02, 0.16)
+        ctr = np.clip(ctr * ctr_mult, 0.01, 0.14)
+        return {(p, h): _Slice(er[a, b], ctr[a, b], feats[a, b, :, 3])
+                for a, p in enumerate(platforms) for b, h in enumerate(horizons)}
+
+    def _build_recs(self, snap: _CatalogSnapshot, sl: _Slice, top_k: int,
+                    models: Optional[_Predictors]) -> Tuple[List[TopicRec], Dict[str, float]]:
+        cat, er, ctr = snap.cat, sl.er, sl.ctr
+        score = 0.65*(er/0.16) + 0.35*(ctr/0.14)
+
+        # Select by predicted ER (as in screenshot) before building any objects
+        top = _top_k_indices(er, top_k)
+        statuses = _statuses_by_score(score[top])
+        trends = _trend_labels(sl.trend[top])
+        keywords = [cat.keywords(i) for i in top]
+        explains = self._explain_batch(keywords, snap.Xtxt[top] if snap.Xtxt is not None else None,
+                                       [snap.docs[i] for i in top] if snap.docs is not None else None,
+                                       models.key_factor if models is not None else None)
 
+        recs: List[TopicRec] = []
+        for j, i in enumerate(top):
             recs.append(TopicRec(
-                idx=i+1,
-                topic=t.topic,
-                drivers=drivers,
-                er_pred=er,
-                trend=trend,
-                explain=explain,
-                status=status,
-                ctr_pred=ctr
+                idx=int(i)+1,
+                topic=cat.topics[i],
+                drivers=", ".join(keywords[j][:3]),
+                er_pred=float(er[i]),
+                trend=str(trends[j]),
+                explain=explains[j],
+                status=str(statuses[j]),
+                ctr_pred=float(ctr[i])
             ))
 
-        # Sort by predicted ER (as in screenshot)
-        recs.sort(key=lambda r: r.er_pred, reverse=True)
-        recs = recs[:top_k]
-
         # KPIs summary (last 7 days)
         kpi = {
-            "ctr": float(np.mean([r.ctr_pred for r in recs])),
-            "er": float(np.mean([r.er_pred for r in recs])),
-            "trends": float(len([r for r in recs if r.trend == "зростає"])),
+            "ctr": float(np.mean(ctr[top])) if top.size else 0.0,
+            "er": float(np.mean(er[top])) if top.size else 0.0,
+            "trends": float(np.count_nonzero(trends == "зростає")),
             "f1": 0.82,  # demo
         }
         return recs, kpi
 
-    def _explain_topic(self, i: int, t: TopicItem, clusters: np.ndarray, feature_names: Optional[np.ndarray]) -> str:
-        # Simple explanation string:
-        # - strongest TF‑IDF terms for this topic within its cluster (if available)
-        # - feature importance proxy from models (if available)
-        base_terms = [kw for kw in t.keywords[:3]]
-        if self.vectorizer is None or self.kmeans is None or feature_names is None:
-            return "Високий внесок: " + ", ".join(base_terms)
-
-        # Identify top terms for the topic itself
-        text = " ".join([t.topic] + t.keywords)
-        v = self.vectorizer.transform([text]).toarray()[0]
-        top_idx = np.argsort(v)[-3:][::-1]
-        top_terms = [str(feature_names[j]) for j in top_idx if v[j] > 0]
-
-        terms = top_terms if top_terms else base_terms
-
-        # model feature importances (lightweight proxy)
-        parts = []
-        if getattr(self.er_model, "feature_importances_", None) is not None:
-            fi = self.er_model.feature_importances_
-            # map: 0 base,1 season,2 novelty,3 trend_boost,4 cluster_id
-            best = int(np.argmax(fi))
-            labels = ["популярність", "сезонність", "новизна", "тренд", "сегмент"]
-            parts.append(f"ключовий фактор: {labels[best]}")
-        return " / ".join([f"Терміни: {', '.join(terms)}"] + parts)
\ No newline at end of file
+    def _catalog(self, seed: int) -> TopicStore:
+        # Real catalog file (parsed once, re-read only when it changes) or the live-looking demo list
+        if self.catalog_path:
+            return load_topic_store(self.catalog_path)
+        return TopicStore.from_items(make_demo_topics(seed=7 + seed % 10_000))
+
+    @staticmethod
+    def _feature_matrix(cat: TopicStore, deltas: np.ndarray, clusters: np.ndarray) -> np.ndarray:
+        # Features: [base_popularity, seasonality, novelty, trend_boost, cluster_id]
+        feats = np.empty((len(cat), 5), dtype=float)
+        feats[:, 0] = cat.base_popularity
+        feats[:, 1] = cat.seasonality
+        feats[:, 2] = cat.novelty
+        feats[:, 3] = deltas
+        feats[:, 4] = clusters
+        return feats
+
+    @staticmethod
+    def _predict_batch(feats: np.ndarray, models: Optional[_Predictors]) -> Tuple[np.ndarray, np.ndarray]:
+        # One predict() call per model for the whole candidate set
+        base, season, nov, trend_boost = feats[:, 0], feats[:, 1], feats[:, 2], feats[:, 3]
+        if models is not None and models.flat is not None and len(feats) <= FLAT_PREDICT_MAX_ROWS:
+            both = models.flat.predict(feats)
+            return both[:, 0], both[:, 1]
+        if models is not None:
+            er = models.er_model.predict(feats)
+        else:
+            er = np.clip(0.06 + 0.06*base + 0.04*nov + trend_boost, 0.02, 0.16)
+
+        if models is not None:
+            ctr = models.ctr_model.predict(feats)
+        else:
+            ctr = np.clip(0.04 + 0.05*base + 0.03*season + 0.6*trend_boost, 0.01, 0.14)
+        return np.asarray(er, dtype=float), np.asarray(ctr, dtype=float)
+
+    def _explain_batch(self, keywords: List[List[str]], Xtxt: Optional[Any], docs: Optional[list],
+                       key_factor: Optional[str], k: int = 3) -> List[str]:
+        # Simple explanation strings:
+        # - strongest TF‑IDF terms per topic, taken from the sparse matrix rows (if available)
+        # - feature importance proxy from models (computed once per fitted model)
+        if Xtxt is None or docs is None:
+            return ["Високий внесок: " + ", ".join(kws[:k]) for kws in keywords]
+
+        parts = [f"ключовий фактор: {key_factor}"] if key_factor else []
+        out: List[str] = []
+        for kws, doc, cols in zip(keywords, docs, _top_terms_per_row(Xtxt, k)):
+            terms = TextFeaturePipeline.terms_of(doc, cols) or kws[:k]
+            out.append(" / ".join([f"Терміни: {', '.join(terms)}"] + parts))
+        return out
@@ -0,0 +1,206 @@
+from __future__ import annotations
+import os
+import re
+import sqlite3
+import datetime as dt
+from dataclasses import dataclass
+from typing import Callable, Iterable, List, Optional, Tuple
+
+@dataclass
+class ReportEntry:
+    rid: int
+    title: str
+    period: str
+    fmt: str
+    created_at: dt.datetime
+    status: str
+    filepath: str
+    error: str = ""
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS reports (
+    rid          INTEGER PRIMARY KEY AUTOINCREMENT,
+    title        TEXT NOT NULL,
+    period       TEXT NOT NULL,
+    fmt          TEXT NOT NULL,
+    created_at   TEXT NOT NULL,
+    status       TEXT NOT NULL,
+    filepath     TEXT NOT NULL,
+    error        TEXT NOT NULL DEFAULT '',
+    content_hash TEXT,
+    render_key   TEXT,
+    size         INTEGER NOT NULL DEFAULT 0,
+    last_used    TEXT
+);
+CREATE INDEX IF NOT EXISTS reports_created ON reports(created_at DESC, rid DESC);
+CREATE INDEX IF NOT EXISTS reports_title ON reports(title, created_at DESC);
+CREATE INDEX IF NOT EXISTS reports_fmt ON reports(fmt, created_at DESC);
+CREATE INDEX IF NOT EXISTS reports_hash ON reports(content_hash) WHERE content_hash IS NOT NULL;
+CREATE INDEX IF NOT EXISTS reports_path ON reports(filepath);
+CREATE INDEX IF NOT EXISTS reports_render_key ON reports(render_key) WHERE render_key IS NOT NULL;
+"""
+
+# columns added after the first release of the schema: name -> definition
+_ADDED_COLUMNS = {
+    "render_key": "TEXT",
+    "size": "INTEGER NOT NULL DEFAULT 0",
+    "last_used": "TEXT",
+}
+
+_COLUMNS = "rid, title, period, fmt, created_at, status, filepath, error"
+# files registered from disk have no hash yet; each counts as its own content
+_CONTENT = "COALESCE(content_hash, filepath)"
+
+# report_<title>_<YYYYmmdd_HHMMSS>[_<rid>].<ext>, as written by ReportService
+_FILENAME = re.compile(r"^report_(?P<title>.+)_(?P<ts>\d{8}_\d{6})(?:_\d+)?\.(?P<ext>pdf|csv|parquet|html)$", re.IGNORECASE)
+
+class ReportRegistry:
+    """SQLite catalog of generated reports (reports.sqlite3 next to the files).
+
+    The log is read a page at a time, newest first; filters by template
+    and format use their own indexes.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self.db = sqlite3.connect(db_path)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        have = {r[1] for r in self.db.execute("PRAGMA table_info(reports)")}
+        if have:
+            with self.db:
+                for name, decl in _ADDED_COLUMNS.items():
+                    if name not in have:
+                        self.db.execute(f"ALTER TABLE reports ADD COLUMN {name} {decl}")
+        self.db.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        self.db.close()
+
+    @staticmethod
+    def _entry(row: Tuple) -> ReportEntry:
+        rid, title, period, fmt, created_at, status, filepath, error = row
+        return ReportEntry(rid=rid, title=title, period=period, fmt=fmt, created_at=dt.datetime.fromisoformat(created_at),
+                           status=status, filepath=filepath, error=error)
+
+    def add(self, title: str, period: str, fmt: str, created_at: dt.datetime, status: str,
+            filepath_for: Callable[[int], str], render_key: Optional[str] = None) -> ReportEntry:
+        """Insert a report; filepath_for(rid) names its file once the id is known."""
+        with self.db:
+            cur = self.db.execute(
+                "INSERT INTO reports (title, period, fmt, created_at, status, filepath, render_key, last_used) "
+                "VALUES (?, ?, ?, ?, ?, '', ?, ?)",
+                (title, period, fmt, created_at.isoformat(timespec="seconds"), status, render_key,
+                 created_at.isoformat(timespec="seconds")))
+            rid = cur.lastrowid
+            path = filepath_for(rid)
+            self.db.execute("UPDATE reports SET filepath = ? WHERE rid = ?", (path, rid))
+        return self._entry((rid, title, period, fmt, created_at.isoformat(timespec="seconds"), status, path, ""))
+
+    def update(self, entry: ReportEntry, content_hash: Optional[str] = None, size: Optional[int] = None) -> None:
+        with self.db:
+            self.db.execute(
+                "UPDATE reports SET status = ?, error = ?, filepath = ?, content_hash = COALESCE(?, content_hash), "
+                "size = COALESCE(?, size) WHERE rid = ?",
+                (entry.status, entry.error, entry.filepath, content_hash, size, entry.rid))
+
+    # ---------- render cache ----------
+    def find_by_render_key(self, render_key: str, status: str) -> Optional[Tuple[ReportEntry, Optional[str], int]]:
+        """Newest entry rendered from the same inputs: (entry, content hash, size)."""
+        row = self.db.execute(
+            f"SELECT {_COLUMNS}, content_hash, size FROM reports WHERE render_key = ? AND status = ? "
+            "ORDER BY rid DESC LIMIT 1", (render_key, status)).fetchone()
+        return (self._entry(row[:8]), row[8], row[9]) if row else None
+
+    def touch(self, content_hash: str, when: dt.datetime) -> None:
+        with self.db:
+            self.db.execute("UPDATE reports SET last_used = ? WHERE content_hash = ?",
+                            (when.isoformat(timespec="seconds"), content_hash))
+
+    def cache_bytes(self, status: str) -> int:
+        """Disk used by ready reports; entries sharing content share one (hard-linked) file."""
+        return self.db.execute(
+            f"SELECT COALESCE(SUM(size), 0) FROM (SELECT MAX(size) AS size FROM reports "
+            f"WHERE status = ? GROUP BY {_CONTENT})", (status,)).fetchone()[0]
+
+    def least_recently_used(self, status: str) -> List[Tuple[str, int]]:
+        """(content key, size) of ready reports, least recently used first."""
+        return self.db.execute(
+            f"SELECT {_CONTENT}, MAX(size) FROM reports WHERE status = ? "
+            f"GROUP BY {_CONTENT} ORDER BY MAX(COALESCE(last_used, created_at))", (status,)).fetchall()
+
+    def evict(self, content: str, status: str, evicted: str) -> List[str]:
+        """Mark every ready entry with this content key evicted; returns their file paths."""
+        paths = [p for (p,) in self.db.execute(
+            f"SELECT filepath FROM reports WHERE {_CONTENT} = ? AND status = ?", (content, status))]
+        with self.db:
+            self.db.execute(f"UPDATE reports SET status = ? WHERE {_CONTENT} = ? AND status = ?",
+                            (evicted, content, status))
+        return paths
+
+    def find_by_hash(self, content_hash: str, exclude_rid: int, status: str) -> Optional[ReportEntry]:
+        row = self.db.execute(
+            f"SELECT {_COLUMNS} FROM reports WHERE content_hash = ? AND status = ? AND rid <> ? ORDER BY rid LIMIT 1",
+            (content_hash, status, exclude_rid)).fetchone()
+        return self._entry(row) if row else None
+
+    def count(self, title: Optional[str] = None, fmt: Optional[str] = None) -> int:
+        where, args = self._where(title, fmt)
+        return self.db.execute(f"SELECT COUNT(*) FROM reports{where}", args).fetchone()[0]
+
+    def page(self, offset: int = 0, limit: int = 200, title: Optional[str] = None, fmt: Optional[str] = None) -> List[ReportEntry]:
+        """Newest first."""
+        where, args = self._where(title, fmt)
+        rows = self.db.execute(
+            f"SELECT {_COLUMNS} FROM reports{where} ORDER BY created_at DESC, rid DESC LIMIT ? OFFSET ?",
+            (*args, limit, offset)).fetchall()
+        return [self._entry(r) for r in rows]
+
+    def get(self, rid: int) -> Optional[ReportEntry]:
+        row = self.db.execute(f"SELECT {_COLUMNS} FROM reports WHERE rid = ?", (rid,)).fetchone()
+        return self._entry(row) if row else None
+
+    @staticmethod
+    def _where(title: Optional[str], fmt: Optional[str]) -> Tuple[str, tuple]:
+        conds, args = [], []
+        if title is not None:
+            conds.append("title = ?"); args.append(title)
+        if fmt is not None:
+            conds.append("fmt = ?"); args.append(fmt.upper())
+        return (" WHERE " + " AND ".join(conds) if conds else ""), tuple(args)
+
+    def rebuild(self, reports_dir: str, ready: str, pending: Iterable[str], interrupted: str) -> int:
+        """Bring the catalog in line with the files on disk; returns the number of rows added.
+
+        Files without a row are registered from their names, rows of ready
+        reports whose file is gone are dropped, and jobs left pending by a
+        previous run are marked interrupted.
+        """
+        on_disk = {}
+        with os.scandir(reports_dir) as it:
+            for e in it:
+                m = _FILENAME.match(e.name)
+                if m and e.is_file():
+                    on_disk[e.path] = (m, e.stat().st_size)
+        known = {p for (p,) in self.db.execute("SELECT filepath FROM reports")}
+        pending = tuple(pending)
+        new_rows = []
+        for path in sorted(set(on_disk) - known):
+            m, size = on_disk[path]
+            try:
+                created = dt.datetime.strptime(m["ts"], "%Y%m%d_%H%M%S")
+            except ValueError:
+                continue
+            new_rows.append((m["title"].replace("_", " "), "—", m["ext"].upper(),
+                             created.isoformat(timespec="seconds"), ready, path, size))
+        gone = [(p, ready) for p in known - set(on_disk)]
+        with self.db:
+            self.db.executemany(
+                "INSERT INTO reports (title, period, fmt, created_at, status, filepath, size) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                new_rows)
+            self.db.executemany("DELETE FROM reports WHERE filepath = ? AND status = ?", gone)
+            if pending:
+                self.db.execute(
+                    f"UPDATE reports SET status = ? WHERE status IN ({','.join('?' * len(pending))})",
+                    (interrupted, *pending))
+        return len(new_rows)
@@ -0,0 +1,113 @@
+from __future__ import annotations
+import hashlib
+from dataclasses import dataclass, fields
+from functools import cached_property
+from typing import TYPE_CHECKING, Dict, Iterator, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+if TYPE_CHECKING:
+    from app.services.recommender import TopicRec
+
+def _frozen(a: np.ndarray) -> np.ndarray:
+    a = np.ascontiguousarray(a)
+    a.setflags(write=False)
+    return a
+
+@dataclass(frozen=True, eq=False)
+class ReportSnapshot:
+    """Immutable, columnar copy of everything a report shows.
+
+    Taken once per export on the GUI thread; every format renders from it,
+    so derived columns (percentages, formatted strings, frames) are computed
+    once and shared. Pickles without the recommender stack, which keeps
+    report worker processes light.
+    """
+    topic: Tuple[str, ...]
+    drivers: Tuple[str, ...]
+    trend: Tuple[str, ...]
+    status: Tuple[str, ...]
+    explain: Tuple[str, ...]
+    er_pct: np.ndarray   # float64, rounded to 0.1
+    ctr_pct: np.ndarray
+    kpi: Tuple[Tuple[str, float], ...]
+    seg_name: Tuple[str, ...]
+    seg_share_pct: np.ndarray
+    seg_focus: Tuple[str, ...]
+
+    def __len__(self) -> int:
+        return len(self.topic)
+
+    def __getstate__(self) -> Dict[str, object]:
+        # only the columns travel to worker processes; derived caches are rebuilt there on demand
+        return {f.name: getattr(self, f.name) for f in fields(self)}
+
+    def kpi_value(self, key: str, default: float = 0.0) -> float:
+        return dict(self.kpi).get(key, default)
+
+    @cached_property
+    def digest(self) -> str:
+        """Content hash of the columns; equal snapshots render to equal reports."""
+        h = hashlib.sha256()
+        for f in fields(self):
+            v = getattr(self, f.name)
+            if isinstance(v, np.ndarray):
+                h.update(v.dtype.str.encode())
+                h.update(v.tobytes())
+            elif v and all(isinstance(x, str) for x in v):
+                h.update("\x1f".join(v).encode())
+            else:
+                h.update(repr(v).encode())
+            h.update(b"\x1e")
+        return h.hexdigest()
+
+    @cached_property
+    def er_text(self) -> Tuple[str, ...]:
+        return tuple(f"{v:.1f}%" for v in self.er_pct.tolist())
+
+    @cached_property
+    def ctr_text(self) -> Tuple[str, ...]:
+        return tuple(f"{v:.1f}%" for v in self.ctr_pct.tolist())
+
+    @cached_property
+    def recs_frame(self) -> pd.DataFrame:
+        return pd.DataFrame({
+            "№": np.arange(1, len(self) + 1),
+            "Тема": self.topic,
+            "Ключові драйвери": self.drivers,
+            "Прогноз ER": self.er_pct,
+            "Прогноз CTR": self.ctr_pct,
+            "Тренд": self.trend,
+            "Статус": self.status,
+            "Пояснюваність": self.explain,
+        })
+
+    @cached_property
+    def segments_frame(self) -> pd.DataFrame:
+        return pd.DataFrame({"Сегмент": self.seg_name, "Частка": self.seg_share_pct, "Фокус інтересу": self.seg_focus})
+
+    def rec_rows(self) -> Iterator[Tuple[int, str, str, str, str, str, str]]:
+        return zip(range(1, len(self) + 1), self.topic, self.er_text, self.ctr_text, self.trend, self.status, self.explain)
+
+    def segment_rows(self) -> Iterator[Tuple[str, str, str]]:
+        return zip(self.seg_name, (f"{v:.0f}%" for v in self.seg_share_pct.tolist()), self.seg_focus)
+
+    @classmethod
+    def from_recs(cls, recs: Sequence[TopicRec], kpi: Dict[str, float], segments_df: pd.DataFrame) -> "ReportSnapshot":
+        n = len(recs)
+        er = np.fromiter((r.er_pred for r in recs), dtype=np.float64, count=n)
+        ctr = np.fromiter((r.ctr_pred for r in recs), dtype=np.float64, count=n)
+        return cls(
+            topic=tuple(r.topic for r in recs),
+            drivers=tuple(r.drivers for r in recs),
+            trend=tuple(r.trend for r in recs),
+            status=tuple(r.status for r in recs),
+            explain=tuple(r.explain for r in recs),
+            er_pct=_frozen(np.round(er * 100, 1)),
+            ctr_pct=_frozen(np.round(ctr * 100, 1)),
+            kpi=tuple(kpi.items()),
+            seg_name=tuple(segments_df["Сегмент"].astype(str)) if len(segments_df) else (),
+            seg_share_pct=_frozen(segments_df["Частка"].to_numpy(dtype=np.float64) if len(segments_df) else np.zeros(0)),
+            seg_focus=tuple(segments_df["Фокус інтересу"].astype(str)) if len(segments_df) else (),
+        )
@@ -1,98 +1,289 @@
 from __future__ import annotations
 import os
 import datetime as dt
-from dataclasses import dataclass
-from typing import List, Dict, Any, Optional
-
-import pandas as pd
-from reportlab.lib.pagesizes import A4
-from reportlab.pdfgen import canvas
-from reportlab.lib.units import cm
-
-from app.services.recommender import TopicRec
-
-@dataclass
-class ReportEntry:
-    rid: int
-    title: str
-    period: str
-    fmt: str
-    created_at: dt.datetime
-    status: str
-    filepath: str
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import hashlib
+import html
+import pickle
+from typing import Callable, List, Dict, Optional, Sequence, Tuple
+
+from app.services.pdf_writer import PdfTableWriter
+from app.services.report_snapshot import ReportSnapshot
+from app.services.report_registry import ReportEntry, ReportRegistry
+from app.services.table_export import PARQUET_AVAILABLE, export_table, kpi_sidecar_path, snapshot_chunks
+
+STATUS_QUEUED = "в черзі"
+STATUS_RUNNING = "формується"
+STATUS_READY = "готовий"
+STATUS_FAILED = "помилка"
+STATUS_CANCELLED = "скасовано"
+STATUS_INTERRUPTED = "перервано"  # was pending when the app closed
+STATUS_EVICTED = "видалено"  # file removed to keep the reports dir within its size budget
+PENDING_STATUSES = (STATUS_QUEUED, STATUS_RUNNING)
+MERGED_TITLE = "Об’єднаний звіт"
+# Parquet only with pyarrow installed, so the UI never offers a format that cannot render
+FORMATS = ("PDF", "CSV", "PARQUET", "HTML") if PARQUET_AVAILABLE else ("PDF", "CSV", "HTML")
+RENDER_VERSION = "2"  # bump when renderer output changes, so cached reports are not reused
+
+def render_key(fmt: str, titles: Sequence[str], period_from: dt.date, period_to: dt.date,
+               snapshot: ReportSnapshot) -> str:
+    """Identity of a rendered report: same key, same bytes."""
+    parts = [RENDER_VERSION, fmt.upper(), period_from.isoformat(), period_to.isoformat(), snapshot.digest, *titles]
+    return hashlib.sha256("\x1f".join(parts).encode()).hexdigest()
+
+def report_files(path: str) -> List[str]:
+    """The report file and its sidecars (KPIs of table exports) that exist on disk."""
+    side = kpi_sidecar_path(path)
+    return [path, side] if side != path and os.path.exists(side) else [path]
+
+def _link(src: str, dst: str) -> str:
+    """Hard-link src (and its sidecars) as dst; falls back to sharing src where links are not supported."""
+    try:
+        for s, d in zip(report_files(src), (dst, kpi_sidecar_path(dst))):
+            if os.path.exists(d):
+                os.remove(d)
+            os.link(s, d)
+        return dst
+    except OSError:
+        return src
+
+def _render(path: str, fmt: str, titles: Sequence[str], period: str, snap: ReportSnapshot,
+            progress: Optional[Callable[[int], None]] = None) -> str:
+    fmt = fmt.lower()
+    if fmt == "pdf":
+        ReportService._to_pdf(path, titles, period, snap, progress)
+    elif fmt in ("csv", "parquet"):
+        export_table(path, fmt, snapshot_chunks(snap), dict(snap.kpi), progress)
+    elif fmt == "html":
+        ReportService._to_html(path, titles[0], period, snap)
+    else:
+        raise ValueError("Unsupported format")
+    return path
+
+def file_hash(path: str) -> str:
+    """Hash of the report bytes, sidecars included, so equal hashes mean interchangeable files."""
+    h = hashlib.sha256()
+    for p in report_files(path):
+        with open(p, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                h.update(block)
+    return h.hexdigest()
+
+def _render_job(path: str, fmt: str, titles: Sequence[str], period: str, payload: bytes) -> str:
+    # the snapshot is pickled once per batch, not once per job
+    _render(path, fmt, titles, period, pickle.loads(payload))
+    return file_hash(path)
 
 class ReportService:
-    def __init__(self, reports_dir: str):
+    """Renders reports into reports_dir and keeps their log (a ReportRegistry).
+
+    build() renders on the calling thread; submit() / submit_batch() queue
+    renders on a process pool and poll() moves them to ready or failed.
+    A request matching a ready report is answered from it without rendering.
+    """
+
+    def __init__(self, reports_dir: str, max_workers: Optional[int] = None, max_cache_bytes: int = 512 * 2**20):
         self.reports_dir = reports_dir
         os.makedirs(self.reports_dir, exist_ok=True)
-        self._entries: List[ReportEntry] = []
-        self._next_id = 1
+        self.registry = ReportRegistry(os.path.join(reports_dir, "reports.sqlite3"))
+        self.registry.rebuild(reports_dir, STATUS_READY, PENDING_STATUSES, STATUS_INTERRUPTED)
+        self.max_cache_bytes = max_cache_bytes
+        self._evict()
+        self.max_workers = max_workers or max(1, min(4, os.cpu_count() or 1))
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._jobs: Dict[int, Tuple[ReportEntry, Future]] = {}
+        self._cancelled: set = set()
+
+    def count(self) -> int:
+        return self.registry.count()
+
+    def entries(self, offset: int = 0, limit: int = 200) -> List[ReportEntry]:
+        """A page of the report log, newest first."""
+        return self.registry.page(offset, limit)
+
+    def _new_entry(self, template_name: str, period_from: dt.date, period_to: dt.date, fmt: str,
+                   status: str, key: Optional[str] = None) -> ReportEntry:
+        now = dt.datetime.now().replace(microsecond=0)
+        period = f"{period_from:%d.%m}–{period_to:%d.%m}"
+        safe = "".join([c for c in template_name if c.isalnum() or c in " _-"]).strip().replace(" ", "_")
+        # the id keeps names unique when several reports start within the same second
+        return self.registry.add(template_name, period, fmt.upper(), now, status, lambda rid: os.path.join(
+            self.reports_dir, f"report_{safe}_{now:%Y%m%d_%H%M%S}_{rid}.{fmt.lower()}"), key)
+
+    def _from_cache(self, title: str, period_from: dt.date, period_to: dt.date, fmt: str,
+                    key: str) -> Optional[ReportEntry]:
+        hit = self.registry.find_by_render_key(key, STATUS_READY)
+        if hit is None or not os.path.exists(hit[0].filepath):
+            return None
+        cached, content_hash, size = hit
+        entry = self._new_entry(title, period_from, period_to, fmt, STATUS_READY, key)
+        entry.filepath = _link(cached.filepath, entry.filepath)
+        self.registry.update(entry, content_hash, size)
+        if content_hash:
+            self.registry.touch(content_hash, entry.created_at)
+        return entry
+
+    def _finish(self, entry: ReportEntry, content_hash: Optional[str]) -> None:
+        size = None
+        if entry.status == STATUS_READY and content_hash:
+            same = self.registry.find_by_hash(content_hash, entry.rid, STATUS_READY)
+            if same is not None and same.filepath != entry.filepath and os.path.exists(same.filepath):
+                # same bytes as an earlier report: keep one copy on disk
+                entry.filepath = _link(same.filepath, entry.filepath)
+            size = sum(os.path.getsize(p) for p in report_files(entry.filepath))
+        self.registry.update(entry, content_hash, size)
+        if size is not None:
+            self.registry.touch(content_hash, dt.datetime.now())
+            self._evict(keep=content_hash)
+
+    def _evict(self, keep: Optional[str] = None) -> None:
+        # past max_cache_bytes, the least recently used report files go
+        total = self.registry.cache_bytes(STATUS_READY)
+        if total <= self.max_cache_bytes:
+            return
+        for content, size in self.registry.least_recently_used(STATUS_READY):
+            if content == keep:
+                continue  # the report just produced always stays
+            for path in self.registry.evict(content, STATUS_READY, STATUS_EVICTED):
+                for p in report_files(path):
+                    try:
+                        os.remove(p)
+                    except OSError:
+                        pass
+            total -= size
+            if total <= self.max_cache_bytes:
+                break
+
+    # ---------- background jobs ----------
+    def _executor(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # spawn: forking a process that runs Qt and BLAS threads is not safe
+            self._pool = ProcessPoolExecutor(self.max_workers, mp_context=multiprocessing.get_context("spawn"))
+        return self._pool
+
+    def submit(self, template_name: str, period_from: dt.date, period_to: dt.date, fmt: str,
+               snapshot: ReportSnapshot) -> ReportEntry:
+        return self.submit_batch([template_name], period_from, period_to, [fmt], snapshot, merge_pdf=False)[0]
+
+    def submit_batch(self, templates: Sequence[str], period_from: dt.date, period_to: dt.date, fmts: Sequence[str],
+                     snapshot: ReportSnapshot, merge_pdf: bool = True) -> List[ReportEntry]:
+        """Queue every template in every format; they render concurrently across the pool.
+
+        With merge_pdf and several templates, their PDFs become one merged
+        document (a section per template) instead of one file each.
+        """
+        fmts = [f.upper() for f in fmts]
+        bad = [f for f in fmts if f not in FORMATS]
+        if bad:
+            raise ValueError(f"Unsupported format: {bad[0]}")
+        payload = None
+        jobs = []
+        for fmt in fmts:
+            if fmt == "PDF" and merge_pdf and len(templates) > 1:
+                jobs.append((MERGED_TITLE, fmt, list(templates)))
+            else:
+                jobs.extend((t, fmt, [t]) for t in templates)
+        out = []
+        for title, fmt, titles in jobs:
+            key = render_key(fmt, titles, period_from, period_to, snapshot)
+            entry = self._from_cache(title, period_from, period_to, fmt, key)
+            if entry is not None:
+                out.append(entry)
+                continue
+            if payload is None:
+                payload = pickle.dumps(snapshot, protocol=pickle.HIGHEST_PROTOCOL)
+            entry = self._new_entry(title, period_from, period_to, fmt, STATUS_QUEUED, key)
+            try:
+                fut = self._executor().submit(_render_job, entry.filepath, fmt, titles, entry.period, payload)
+            except Exception as e:
+                if isinstance(e, BrokenProcessPool):
+                    self._pool = None  # a worker died; the next submit starts a fresh pool
+                entry.status, entry.error = STATUS_FAILED, str(e) or type(e).__name__
+                self._finish(entry, None)
+            else:
+                self._jobs[entry.rid] = (entry, fut)
+            out.append(entry)
+        return out
 
-    def entries(self) -> List[ReportEntry]:
-        return list(self._entries)
+    def cancel(self, rid: int) -> bool:
+        """Cancel a queued job, or discard the output of a running one once it finishes."""
+        job = self._jobs.get(rid)
+        if job is None:
+            return False
+        if not job[1].cancel():
+            self._cancelled.add(rid)
+        self.poll()
+        return True
+
+    def pending(self) -> int:
+        return len(self._jobs)
+
+    def poll(self) -> List[ReportEntry]:
+        """Update statuses of background jobs; returns the entries that changed."""
+        if not self._jobs:
+            return []
+        changed = []
+        for rid, (entry, fut) in list(self._jobs.items()):
+            status, content_hash = entry.status, None
+            if fut.cancelled():
+                entry.status = STATUS_CANCELLED
+            elif fut.done():
+                exc = fut.exception()
+                if rid in self._cancelled:
+                    entry.status = STATUS_CANCELLED
+                    if exc is None and os.path.exists(entry.filepath):
+                        for p in report_files(entry.filepath):
+                            os.remove(p)
+                elif exc is not None:
+                    entry.status, entry.error = STATUS_FAILED, str(exc) or type(exc).__name__
+                else:
+                    entry.status, content_hash = STATUS_READY, fut.result()
+            elif fut.running():
+                entry.status = STATUS_RUNNING
+            if fut.done():
+                del self._jobs[rid]
+                self._cancelled.discard(rid)
+            if entry.status != status:
+                self._finish(entry, content_hash)
+                changed.append(entry)
+        return changed
+
+    def shutdown(self, wait: bool = False) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=wait, cancel_futures=True)
+            self._pool = None
+        for entry, _ in self._jobs.values():
+            entry.status = STATUS_INTERRUPTED
+            self.registry.update(entry)
+        self._jobs.clear()
 
     def build(self, template_name: str, period_from: dt.date, period_to: dt.date, fmt: str,
-              recs: List[TopicRec], kpi: Dict[str, float], segments_df: pd.DataFrame) -> ReportEntry:
-        now = dt.datetime.now()
-        period = f\"{period_from:%d.%m}–{period_to:%d.%m}\"
-        safe = \"\".join([c for c in template_name if c.isalnum() or c in \" _-\"]).strip().replace(\" \", \"_\")
-        filename = f\"report_{safe}_{now:%Y%m%d_%H%M%S}.{fmt.lower()}\"
-        path = os.path.join(self.reports_dir, filename)
-
-        title = template_name
-        if fmt.lower() == "pdf":
-            self._to_pdf(path, title, period, recs, kpi, segments_df)
-        elif fmt.lower() == "csv":
-            self._to_csv(path, recs, kpi, segments_df)
-        elif fmt.lower() == "html":
-            self._to_html(path, title, period, recs, kpi, segments_df)
-        else:
-            raise ValueError(\"Unsupported format\") 
-
-        entry = ReportEntry(
-            rid=self._next_id,
-            title=title,
-            period=period,
-            fmt=fmt.upper(),
-            created_at=now,
-            status=\"готовий\",
-            filepath=path
-        )
-        self._next_id += 1
-        self._entries.insert(0, entry)
+              snapshot: ReportSnapshot, progress: Optional[Callable[[int], None]] = None) -> ReportEntry:
+        if fmt.upper() not in FORMATS:
+            raise ValueError("Unsupported format")
+        key = render_key(fmt, [template_name], period_from, period_to, snapshot)
+        cached = self._from_cache(template_name, period_from, period_to, fmt, key)
+        if cached is not None:
+            return cached
+        entry = self._new_entry(template_name, period_from, period_to, fmt, STATUS_RUNNING, key)
+        try:
+            _render(entry.filepath, fmt, [entry.title], entry.period, snapshot, progress)
+        except Exception as e:
+            entry.status, entry.error = STATUS_FAILED, str(e)
+            self._finish(entry, None)
+            raise
+        entry.status = STATUS_READY
+        self._finish(entry, file_hash(entry.filepath))
         return entry
 
-    def _to_csv(self, path: str, recs: List[TopicRec], kpi: Dict[str, float], segments_df: pd.DataFrame) -> None:
-        df = pd.DataFrame([{
-            \"№\": i+1,
-            \"Тема\": r.topic,
-            \"Ключові драйвери\": r.drivers,
-            \"Прогноз ER\": round(r.er_pred*100, 1),
-            \"Прогноз CTR\": round(r.ctr_pred*100, 1),
-            \"Тренд\": r.trend,
-            \"Статус\": r.status,
-            \"Пояснюваність\": r.explain,
-        } for i, r in enumerate(recs)])
-        # Add KPI as header-like rows
-        kpi_rows = pd.DataFrame([
-            {\"№\": \"KPI\", \"Тема\": \"Середній ER (%)\", \"Ключові драйвери\": round(kpi.get(\"er\", 0.0)*100, 1)},
-            {\"№\": \"KPI\", \"Тема\": \"Середній CTR (%)\", \"Ключові драйвери\": round(kpi.get(\"ctr\", 0.0)*100, 1)},
-            {\"№\": \"KPI\", \"Тема\": \"К-сть трендів (росте)\", \"Ключові драйвери\": int(kpi.get(\"trends\", 0))},
-            {\"№\": \"KPI\", \"Тема\": \"Якість моделі (F1)\", \"Ключові драйвери\": kpi.get(\"f1\", 0.0)},
-        ])
-        out = pd.concat([kpi_rows, df], ignore_index=True)
-        out.to_csv(path, index=False, encoding=\"utf-8-sig\")
-
-    def _to_html(self, path: str, title: str, period: str, recs: List[TopicRec], kpi: Dict[str, float], segments_df: pd.DataFrame) -> None:
-        df = pd.DataFrame([{
-            \"Тема\": r.topic,
-            \"Прогноз ER (%)\": round(r.er_pred*100, 1),
-            \"Прогноз CTR (%)\": round(r.ctr_pred*100, 1),
-            \"Тренд\": r.trend,
-            \"Статус\": r.status,
-            \"Пояснюваність\": r.explain,
-        } for r in recs])
-        kpi_html = f\"\"\"
+    @staticmethod
+    def _to_html(path: str, title: str, period: str, snap: ReportSnapshot) -> None:
+        df = snap.recs_frame[["Тема", "Прогноз ER", "Прогноз CTR", "Тренд", "Статус", "Пояснюваність"]].rename(
+            columns={"Прогноз ER": "Прогноз ER (%)", "Прогноз CTR": "Прогноз CTR (%)"})
+        kpi = dict(snap.kpi)
+        kpi_html = f"""
         <div style='display:flex;gap:12px;flex-wrap:wrap'>
           <div style='padding:12px;border:1px solid #d7e3f4;border-radius:12px;background:#fff'>
             <div style='color:#64748b'>Середній CTR</div><div style='font-size:20px;font-weight:700'>{kpi.get('ctr',0)*100:.1f}%</div>
@@ -107,9 +298,10 @@ class ReportService:
             <div style='color:#64748b'>Якість моделі (F1)</div><div style='font-size:20px;font-weight:700'>{kpi.get('f1',0):.2f}</div>
           </div>
         </div>
-        \"\"\"
-        seg_html = segments_df.to_html(index=False, escape=False)
-        html = f\"\"\"<!doctype html>
+        """
+        seg_html = snap.segments_frame.to_html(index=False, escape=True)
+        title, period = html.escape(title), html.escape(period)
+        doc = f"""<!doctype html>
 <html>
 <head><meta charset='utf-8'/><title>{title}</title></head>
 <body style='font-family:Segoe UI,Arial;background:#f4f7fb;padding:24px;color:#0f172a'>
@@ -118,58 +310,38 @@ class ReportService:
   {kpi_html}
   <h3 style='margin-top:22px'>Рекомендовані теми</h3>
   <div style='background:#fff;border:1px solid #d7e3f4;border-radius:12px;padding:12px'>
-    {df.to_html(index=False, escape=False)}
+    {df.to_html(index=False, escape=True)}
   </div>
   <h3 style='margin-top:22px'>Сегменти аудиторії</h3>
   <div style='background:#fff;border:1px solid #d7e3f4;border-radius:12px;padding:12px'>
     {seg_html}
   </div>
-</body></html>\"\"\"
-        with open(path, \"w\", encoding=\"utf-8\") as f:
-            f.write(html)
-
-    def _to_pdf(self, path: str, title: str, period: str, recs: List[TopicRec], kpi: Dict[str, float], segments_df: pd.DataFrame) -> None:
-        c = canvas.Canvas(path, pagesize=A4)
-        w, h = A4
-        x0, y = 2*cm, h - 2*cm
-
-        def line(txt, dy=14, bold=False):
-            nonlocal y
-            c.setFont(\"Helvetica-Bold\" if bold else \"Helvetica\", 11 if not bold else 12)
-            c.drawString(x0, y, txt)
-            y -= dy
-
-        line(title, dy=18, bold=True)
-        line(f\"Період: {period}\", dy=16)
-        line(f\"Середній CTR: {kpi.get('ctr',0)*100:.1f}% | Середній ER: {kpi.get('er',0)*100:.1f}% | Трендів (зростає): {int(kpi.get('trends',0))} | F1: {kpi.get('f1',0):.2f}\", dy=18)
-
-        line(\"Рекомендовані теми:\", dy=16, bold=True)
-        c.setFont(\"Helvetica\", 10)
-
-        for i, r in enumerate(recs, start=1):
-            text = f\"{i}. {r.topic} | ER: {r.er_pred*100:.1f}% | CTR: {r.ctr_pred*100:.1f}% | {r.trend} | {r.status}\"
-            c.drawString(x0, y, text[:110])
-            y -= 14
-            c.setFillColorRGB(0.38,0.45,0.55)
-            c.drawString(x0, y, (\"Пояснюваність: \" + r.explain)[:120])
-            c.setFillColorRGB(0,0,0)
-            y -= 14
-            if y < 3*cm:
-                c.showPage()
-                y = h - 2*cm
-                c.setFont(\"Helvetica\", 10)
-
-        y -= 6
-        c.setFont(\"Helvetica-Bold\", 11)
-        c.drawString(x0, y, \"Сегменти аудиторії:\")
-        y -= 16
-        c.setFont(\"Helvetica\", 10)
-        for _, row in segments_df.iterrows():
-            c.drawString(x0, y, f\"- {row['Сегмент']}: {row['Частка']:.0f}% | Фокус: {row['Фокус інтересу']}\")
-            y -= 14
-            if y < 3*cm:
-                c.showPage()
-                y = h - 2*cm
-                c.setFont(\"Helvetica\", 10)
-
-        c.save()
\ No newline at end of file
+</body></html>"""
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(doc)
+
+    @staticmethod
+    def _to_pdf(path: str, titles: Sequence[str], period: str, snap: ReportSnapshot,
+                progress: Optional[Callable[[int], None]] = None) -> None:
+        merged = len(titles) > 1
+        with PdfTableWriter(path, title=MERGED_TITLE if merged else titles[0], progress=progress) as pdf:
+            for i, title in enumerate(titles):
+                if i:
+                    pdf.page_break()
+                ReportService._pdf_section(pdf, title, period, snap)
+
+    @staticmethod
+    def _pdf_section(pdf: PdfTableWriter, title: str, period: str, snap: ReportSnapshot) -> None:
+        kpi = dict(snap.kpi)
+        pdf.heading(title, size=14)
+        pdf.paragraph(f"Період: {period}")
+        pdf.paragraph(f"Середній CTR: {kpi.get('ctr',0)*100:.1f}% | Середній ER: {kpi.get('er',0)*100:.1f}% | "
+                      f"Трендів (зростає): {int(kpi.get('trends',0))} | F1: {kpi.get('f1',0):.2f}", space_after=10)
+
+        pdf.heading("Рекомендовані теми:")
+        pdf.table(
+            [("№", 0.5), ("Тема", 3), ("ER", 0.9), ("CTR", 0.9), ("Тренд", 1.2), ("Статус", 1.4), ("Пояснюваність", 4)],
+            snap.rec_rows())
+
+        pdf.heading("Сегменти аудиторії:")
+        pdf.table([("Сегмент", 2), ("Частка", 0.8), ("Фокус інтересу", 4)], snap.segment_rows())
@@ -0,0 +1,69 @@
+from __future__ import annotations
+from typing import Dict, List, Sequence
+
+import numpy as np
+
+class SearchIndex:
+    """Case-insensitive substring search over a fixed list of documents.
+
+    Built once per refresh (off the GUI thread). Queries of 3+ characters
+    intersect trigram posting lists and verify the few candidates; shorter
+    ones are checked against every document. When a query extends the
+    previous one, candidates are restricted to the previous hits.
+    """
+    N = 3
+
+    def __init__(self, docs: Sequence[str]):
+        self._docs: List[str] = [d.lower() for d in docs]
+        self._all = np.arange(len(self._docs), dtype=np.int64)
+
+        postings: Dict[str, List[int]] = {}
+        for i, d in enumerate(self._docs):
+            for g in {d[j:j+self.N] for j in range(len(d) - self.N + 1)}:
+                postings.setdefault(g, []).append(i)
+        self._postings = {g: np.asarray(ids, dtype=np.int64) for g, ids in postings.items()}
+
+        self._last_query = ""
+        self._last_hits = self._all
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def search(self, query: str) -> np.ndarray:
+        """Sorted ids of documents containing the query."""
+        q = query.strip().lower()
+        grows = bool(self._last_query) and q.startswith(self._last_query)
+        if not q:
+            hits = self._all
+        elif len(q) >= self.N:
+            hits = self._candidates(q)
+            if grows and self._last_hits.size < hits.size:
+                hits = np.intersect1d(hits, self._last_hits, assume_unique=True)
+            if len(q) > self.N:
+                hits = self._verify(hits, q)  # a single trigram's posting list is already exact
+        elif grows:
+            hits = self._verify(self._last_hits, q)
+        else:
+            # 1-2 characters match most documents anyway: a plain scan is as cheap as any index
+            hits = np.fromiter((i for i, d in enumerate(self._docs) if q in d), dtype=np.int64)
+        self._last_query, self._last_hits = q, hits
+        return hits
+
+    def _candidates(self, q: str) -> np.ndarray:
+        lists = []
+        for g in {q[j:j+self.N] for j in range(len(q) - self.N + 1)}:
+            ids = self._postings.get(g)
+            if ids is None:
+                return np.zeros(0, dtype=np.int64)
+            lists.append(ids)
+        lists.sort(key=len)
+        out = lists[0]
+        for ids in lists[1:]:
+            out = np.intersect1d(out, ids, assume_unique=True)
+            if out.size == 0:
+                break
+        return out
+
+    def _verify(self, ids: np.ndarray, q: str) -> np.ndarray:
+        docs = self._docs
+        return np.fromiter((i for i in ids.tolist() if q in docs[i]), dtype=np.int64)
@@ -0,0 +1,153 @@
+from __future__ import annotations
+import csv
+import itertools
+import json
+import os
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, Iterator, Mapping, Optional, Sequence
+
+import numpy as np
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except Exception:  # pragma: no cover
+    pa = pq = None
+PARQUET_AVAILABLE = pq is not None
+
+if TYPE_CHECKING:
+    from app.services.recommender import TopicRec
+    from app.services.report_snapshot import ReportSnapshot
+
+# recommendation table: (column, numpy/arrow type); the same order in every format
+REC_COLUMNS = (
+    ("№", "int64"),
+    ("Тема", "string"),
+    ("Ключові драйвери", "string"),
+    ("Прогноз ER", "float64"),
+    ("Прогноз CTR", "float64"),
+    ("Тренд", "string"),
+    ("Статус", "string"),
+    ("Пояснюваність", "string"),
+)
+# (key in kpi, label, scale); ER/CTR go out in percent like the table
+KPI_FIELDS = (
+    ("er", "Середній ER (%)", 100.0),
+    ("ctr", "Середній CTR (%)", 100.0),
+    ("trends", "К-сть трендів (росте)", None),
+    ("f1", "Якість моделі (F1)", None),
+)
+
+# one chunk: column name -> sequence of equal length
+Chunk = Dict[str, Sequence[object]]
+
+class ExportError(ValueError):
+    pass
+
+def kpi_sidecar_path(path: str) -> str:
+    """report_x.csv -> report_x.kpi.json"""
+    return os.path.splitext(path)[0] + ".kpi.json"
+
+def snapshot_chunks(snap: ReportSnapshot, chunksize: int = 50_000) -> Iterator[Chunk]:
+    """Slices of the snapshot columns; nothing is copied into a frame."""
+    for i in range(0, len(snap), chunksize):
+        j = min(i + chunksize, len(snap))
+        yield {
+            "№": np.arange(i + 1, j + 1, dtype=np.int64),
+            "Тема": snap.topic[i:j],
+            "Ключові драйвери": snap.drivers[i:j],
+            "Прогноз ER": snap.er_pct[i:j],
+            "Прогноз CTR": snap.ctr_pct[i:j],
+            "Тренд": snap.trend[i:j],
+            "Статус": snap.status[i:j],
+            "Пояснюваність": snap.explain[i:j],
+        }
+
+def rec_chunks(recs: Iterable[TopicRec], chunksize: int = 50_000) -> Iterator[Chunk]:
+    """Chunks from recommendations as they are produced (any iterable, e.g. a generator)."""
+    it = iter(recs)
+    start = 1
+    while True:
+        batch = list(itertools.islice(it, chunksize))
+        if not batch:
+            return
+        n = len(batch)
+        yield {
+            "№": np.arange(start, start + n, dtype=np.int64),
+            "Тема": [r.topic for r in batch],
+            "Ключові драйвери": [r.drivers for r in batch],
+            "Прогноз ER": np.round(np.fromiter((r.er_pred for r in batch), np.float64, n) * 100, 1),
+            "Прогноз CTR": np.round(np.fromiter((r.ctr_pred for r in batch), np.float64, n) * 100, 1),
+            "Тренд": [r.trend for r in batch],
+            "Статус": [r.status for r in batch],
+            "Пояснюваність": [r.explain for r in batch],
+        }
+        start += n
+
+def _rows(chunk: Chunk) -> Iterator[tuple]:
+    cols = [chunk[name] for name, _ in REC_COLUMNS]
+    cols = [c.tolist() if isinstance(c, np.ndarray) else c for c in cols]
+    return zip(*cols)
+
+def write_csv(path: str, chunks: Iterable[Chunk], progress: Optional[Callable[[int], None]] = None) -> int:
+    """Header plus one row per recommendation; returns the number of rows."""
+    n = 0
+    with open(path, "w", encoding="utf-8-sig", newline="") as f:
+        w = csv.writer(f)
+        w.writerow([name for name, _ in REC_COLUMNS])
+        for chunk in chunks:
+            w.writerows(_rows(chunk))
+            n += len(chunk["№"])
+            if progress is not None:
+                progress(n)
+    return n
+
+def rec_schema():
+    if pa is None:
+        raise ExportError("Parquet export requires pyarrow")
+    types = {"int64": pa.int64(), "float64": pa.float64(), "string": pa.string()}
+    return pa.schema([pa.field(name, types[t], nullable=False) for name, t in REC_COLUMNS])
+
+def write_parquet(path: str, chunks: Iterable[Chunk], progress: Optional[Callable[[int], None]] = None,
+                  kpi: Optional[Mapping[str, float]] = None) -> int:
+    """One row group per chunk, so only a chunk is held in memory; KPIs also go into the file metadata."""
+    schema = rec_schema()
+    if kpi is not None:
+        schema = schema.with_metadata({"kpi": json.dumps(kpi_record(kpi), ensure_ascii=False)})
+    n = 0
+    with pq.ParquetWriter(path, schema, compression="zstd") as w:
+        for chunk in chunks:
+            w.write_table(pa.Table.from_pydict({name: chunk[name] for name, _ in REC_COLUMNS}, schema=schema))
+            n += len(chunk["№"])
+            if progress is not None:
+                progress(n)
+    return n
+
+def kpi_record(kpi: Mapping[str, float]) -> Dict[str, object]:
+    out: Dict[str, object] = {}
+    for key, _, scale in KPI_FIELDS:
+        v = float(kpi.get(key, 0.0))
+        out[key] = round(v * scale, 1) if scale else v
+    out["trends"] = int(out["trends"])
+    return out
+
+def write_kpi_sidecar(path: str, kpi: Mapping[str, float]) -> str:
+    """KPIs next to the table, typed and labelled: {"er": 6.1, ..., "labels": {...}}."""
+    side = kpi_sidecar_path(path)
+    rec = kpi_record(kpi)
+    rec["labels"] = {key: label for key, label, _ in KPI_FIELDS}
+    with open(side, "w", encoding="utf-8") as f:
+        json.dump(rec, f, ensure_ascii=False, indent=1, sort_keys=True)
+    return side
+
+def export_table(path: str, fmt: str, chunks: Iterable[Chunk], kpi: Mapping[str, float],
+                 progress: Optional[Callable[[int], None]] = None) -> int:
+    """Stream the recommendation table as CSV or Parquet, KPIs in the sidecar; returns the row count."""
+    fmt = fmt.lower()
+    if fmt == "csv":
+        n = write_csv(path, chunks, progress)
+    elif fmt == "parquet":
+        n = write_parquet(path, chunks, progress, kpi)
+    else:
+        raise ExportError(f"Unsupported table format: {fmt}")
+    write_kpi_sidecar(path, kpi)
+    return n
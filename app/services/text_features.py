@@ -0,0 +1,199 @@
+from __future__ import annotations
+import hashlib
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+try:
+    from scipy import sparse
+    from sklearn.cluster import MiniBatchKMeans
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.preprocessing import normalize
+    from sklearn.utils import murmurhash3_32
+except Exception:  # pragma: no cover
+    sparse = None
+    MiniBatchKMeans = None
+    TfidfVectorizer = None
+    normalize = None
+    murmurhash3_32 = None
+
+def content_hash(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+class TextFeaturePipeline:
+    """Incremental TF-IDF + online KMeans over a catalog of topic texts.
+
+    Terms are hashed into a fixed number of columns, so the feature space
+    never changes and the KMeans model can be updated with partial_fit.
+    Unless given, the number of columns is sized from the vocabulary of the
+    first catalog (the dense KMeans centers grow with it), and sized again,
+    with a fresh fit, if a later catalog fills more than half of them.
+    Per-document term counts and cluster assignments are cached by content
+    hash: a refresh analyzes and clusters only new or changed texts,
+    document frequencies are adjusted by the difference.
+    """
+
+    MIN_FEATURES = 2**10
+    MAX_FEATURES = 2**18
+
+    def __init__(self, n_clusters: int = 4, seed: int = 42, n_features: Optional[int] = None):
+        self.n_clusters = n_clusters
+        self.seed = seed
+        self.n_features = n_features
+        self.auto_size = n_features is None
+        self.kmeans = MiniBatchKMeans(n_clusters=n_clusters, random_state=seed, n_init=3, batch_size=1024)
+        self.df = np.zeros(n_features or 0, dtype=np.int64)
+        # hash -> (columns, counts, the document's own first term in each column)
+        self._docs: Dict[str, Tuple[np.ndarray, np.ndarray, Tuple[str, ...]]] = {}
+        self._clusters: Dict[str, int] = {}  # hash -> cluster id
+        self._active: Counter = Counter()  # hashes of the current catalog with multiplicity
+        self._fitted = False
+        self._last: Optional[Tuple[List[str], "sparse.csr_matrix", list]] = None
+        self._last_result: Optional[Tuple[List[str], "sparse.csr_matrix", np.ndarray]] = None
+        self.changed = False
+        self._analyzer = self._build_analyzer()
+
+    @staticmethod
+    def available() -> bool:
+        return MiniBatchKMeans is not None
+
+    @staticmethod
+    def _build_analyzer():
+        # same tokenization / n-grams as the former TfidfVectorizer(ngram_range=(1,2))
+        return TfidfVectorizer(ngram_range=(1, 2)).build_analyzer()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state.pop("_analyzer", None)
+        state["_last"] = None
+        state["_last_result"] = None
+        # df is mostly zeros: stored as (columns, counts)
+        nz = np.flatnonzero(self.df)
+        state["df"] = (len(self.df), nz, self.df[nz])
+        return state
+
+    def __setstate__(self, state):
+        size, nz, counts = state["df"]
+        df = np.zeros(size, dtype=np.int64)
+        df[nz] = counts
+        state["df"] = df
+        self.__dict__.update(state)
+        self._analyzer = self._build_analyzer()
+
+    def _size_features(self, texts: List[str]) -> None:
+        # about two columns per distinct term
+        vocab = set()
+        for t in texts:
+            vocab.update(self._analyzer(t))
+        n = self.MIN_FEATURES
+        while n < 2 * len(vocab) and n < self.MAX_FEATURES:
+            n *= 2
+        self.n_features = n
+        self.df = np.zeros(n, dtype=np.int64)
+
+    def _outgrown(self) -> bool:
+        # sized for at most half the columns in use; past that collisions blur the tf-idf rows
+        return (self.auto_size and self.n_features < self.MAX_FEATURES
+                and 2 * np.count_nonzero(self.df) > self.n_features)
+
+    def documents(self) -> List[Tuple[np.ndarray, np.ndarray, Tuple[str, ...]]]:
+        """(columns, counts, terms) per text of the last update, in the order of the texts."""
+        return self._last[2] if self._last is not None else []
+
+    @staticmethod
+    def terms_of(doc: Tuple[np.ndarray, np.ndarray, Tuple[str, ...]], cols: np.ndarray) -> List[str]:
+        # a column can hold several terms of the catalog; the document's own one explains it
+        doc_cols, _, terms = doc
+        return [terms[i] for i in np.searchsorted(doc_cols, cols).tolist()]
+
+    def update(self, texts: List[str]) -> Tuple["sparse.csr_matrix", np.ndarray]:
+        """Sync the pipeline with the current catalog; returns (tf-idf matrix, cluster ids)."""
+        if self._last_result is not None and self._last_result[0] is texts:
+            # same catalog object as last time (e.g. a cached file catalog): nothing to hash
+            self.changed = False
+            return self._last_result[1], self._last_result[2]
+
+        if self.n_features is None:
+            self._size_features(texts)
+        hashes = [content_hash(t) for t in texts]
+        current = Counter(hashes)
+        added = current - self._active
+        removed = self._active - current
+        self.changed = bool(added or removed)
+
+        if self.changed:
+            first_text = dict(zip(hashes, texts))
+            for h, n in added.items():
+                if h not in self._docs:
+                    self._docs[h] = self._analyze(first_text[h])
+                self.df[self._docs[h][0]] += n
+            for h, n in removed.items():
+                cols = self._docs[h][0]
+                self.df[cols] -= n
+                if h not in current:
+                    del self._docs[h]
+                    self._clusters.pop(h, None)
+            self._active = current
+            if self._outgrown():
+                self.__init__(self.n_clusters, self.seed)
+                return self.update(texts)
+
+        X = self._matrix(hashes)
+
+        pending: Dict[str, int] = {}
+        for i, h in enumerate(hashes):
+            if h not in self._clusters and h not in pending:
+                pending[h] = i
+        if pending:
+            self._cluster_new(X[list(pending.values())], list(pending.keys()))
+
+        clusters = np.fromiter((self._clusters.get(h, 0) for h in hashes), dtype=np.int64, count=len(hashes))
+        self._last_result = (texts, X, clusters)
+        return X, clusters
+
+    def _analyze(self, text: str) -> Tuple[np.ndarray, np.ndarray, Tuple[str, ...]]:
+        counts: Dict[int, int] = {}
+        first: Dict[int, str] = {}
+        for tok in self._analyzer(text):
+            col = murmurhash3_32(tok, seed=0, positive=True) % self.n_features
+            counts[col] = counts.get(col, 0) + 1
+            first.setdefault(col, tok)
+        cols = np.fromiter(counts.keys(), dtype=np.int64, count=len(counts))
+        vals = np.fromiter(counts.values(), dtype=np.float64, count=len(counts))
+        order = np.argsort(cols)
+        cols = cols[order]
+        return cols, vals[order], tuple(first[c] for c in cols.tolist())
+
+    def _matrix(self, hashes: List[str]) -> "sparse.csr_matrix":
+        if not self.changed and self._last is not None and self._last[0] == hashes:
+            return self._last[1]
+        rows = [self._docs[h] for h in hashes]
+        lengths = np.fromiter((len(r[0]) for r in rows), dtype=np.int64, count=len(rows))
+        indptr = np.zeros(len(rows) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=indptr[1:])
+        if rows:
+            indices = np.concatenate([r[0] for r in rows])
+            tf = np.concatenate([r[1] for r in rows])
+        else:
+            indices = np.zeros(0, dtype=np.int64)
+            tf = np.zeros(0, dtype=np.float64)
+        # smooth idf, as TfidfVectorizer's default
+        n = max(1, sum(self._active.values()))
+        idf = np.log((1.0 + n) / (1.0 + self.df[indices])) + 1.0
+        X = sparse.csr_matrix((tf * idf, indices, indptr), shape=(len(rows), self.n_features))
+        if X.shape[0]:  # an empty catalog stays a (0, n_features) matrix
+            X = normalize(X, norm="l2", copy=False)
+        self._last = (hashes, X, rows)
+        return X
+
+    def _cluster_new(self, Xnew: "sparse.csr_matrix", hashes: List[str]) -> None:
+        if not self._fitted and Xnew.shape[0] < self.n_clusters:
+            # too few texts to initialize centers: leave unassigned (cluster 0) until more arrive
+            return
+        self.kmeans.partial_fit(Xnew)
+        self._fitted = True
+        labels = self.kmeans.predict(Xnew)
+        for h, c in zip(hashes, labels):
+            self._clusters[h] = int(c)
+        self.changed = True
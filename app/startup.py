@@ -0,0 +1,86 @@
+from __future__ import annotations
+import importlib
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+# Heavy modules the dashboard needs; warmed up in the background while the login page is shown
+HEAVY_MODULES = (
+    "numpy",
+    "pandas",
+    "sklearn.ensemble",
+    "matplotlib.backends.backend_qtagg",
+    "reportlab.pdfgen.canvas",
+    "app.services.recommender",
+    "app.services.reporting",
+    "app.ui.charts",
+    "app.ui.main_window",
+)
+
+class StartupTimer:
+    """Collects per-import and per-phase timings from launch to a usable dashboard."""
+
+    def __init__(self):
+        self.t0 = time.perf_counter()
+        self._lock = threading.Lock()
+        # (name, start offset, duration, thread name); duration is None for marks
+        self.records: List[Tuple[str, float, Optional[float], str]] = []
+
+    def _add(self, name: str, start: float, duration: Optional[float]) -> None:
+        with self._lock:
+            self.records.append((name, start - self.t0, duration, threading.current_thread().name))
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._add(name, start, time.perf_counter() - start)
+
+    def mark(self, name: str) -> None:
+        self._add(name, time.perf_counter(), None)
+
+    def has_mark(self, name: str) -> bool:
+        with self._lock:
+            return any(r[0] == name and r[2] is None for r in self.records)
+
+    def timed_import(self, module: str) -> None:
+        if module in sys.modules:
+            return
+        with self.phase(f"import {module}"):
+            importlib.import_module(module)
+
+    def report(self) -> str:
+        with self._lock:
+            records = sorted(self.records, key=lambda r: r[1])
+        lines = ["Startup timing (ms): at / took / thread"]
+        for name, at, took, thread in records:
+            took_s = f"{took*1000:8.1f}" if took is not None else "       —"
+            lines.append(f"  {name:<48} {at*1000:8.1f} {took_s}  {thread}")
+        return "\n".join(lines)
+
+STARTUP = StartupTimer()
+
+def prewarm(modules: Sequence[str] = HEAVY_MODULES) -> threading.Thread:
+    """Import heavy modules on a daemon thread; a later import on the GUI thread just waits for it."""
+    def run():
+        for m in modules:
+            try:
+                STARTUP.timed_import(m)
+            except Exception:
+                pass  # the real import on the GUI thread will surface the error
+        STARTUP.mark("prewarm done")
+    th = threading.Thread(target=run, name="prewarm", daemon=True)
+    th.start()
+    return th
+
+def report_enabled() -> bool:
+    return bool(os.environ.get("APP_STARTUP_TIMING"))
+
+def print_report() -> None:
+    if report_enabled():
+        print(STARTUP.report(), file=sys.stderr, flush=True)
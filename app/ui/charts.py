@@ -1,79 +1,276 @@
 from __future__ import annotations
 from dataclasses import dataclass
-from typing import Optional, List, Dict, Tuple
+from typing import Any, Optional, List, Dict, Tuple
 
 from PyQt6.QtWidgets import QWidget, QVBoxLayout
 from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.figure import Figure
+import matplotlib.dates as mdates
+import numpy as np
+
+from app.data.metric_series import MetricSeries, minmax_decimate
 
 class MplCanvas(FigureCanvas):
+    """Canvas that keeps its chart artists between updates.
+
+    Data artists are marked animated: a full draw renders everything else,
+    caches that background and paints the animated artists on top. Later
+    data-only updates restore the background and blit just those artists.
+    """
+
     def __init__(self, parent: Optional[QWidget] = None):
         fig = Figure(figsize=(5, 3), dpi=100)
         self.ax = fig.add_subplot(111)
         super().__init__(fig)
         if parent is not None:
             self.setParent(parent)
+        self.artists: Dict[str, Any] = {}
+        self._animated: List[Any] = []
+        self._background = None
+        self._data_key: Optional[str] = None
+        self.mpl_connect("draw_event", self._on_draw)
+
+    def data_changed(self, *data) -> bool:
+        key = repr(data)
+        if key == self._data_key:
+            return False
+        self._data_key = key
+        return True
+
+    def set_animated(self, artists: List[Any]) -> None:
+        for a in artists:
+            a.set_animated(True)
+        self._animated = list(artists)
+        self._background = None
+
+    def _on_draw(self, event) -> None:
+        self._background = self.copy_from_bbox(self.figure.bbox)
+        for a in self._animated:
+            self.figure.draw_artist(a)
+
+    def blit_update(self) -> None:
+        if self._background is None:
+            self.draw_idle()  # background not captured yet (first draw pending)
+            return
+        self.restore_region(self._background)
+        for a in self._animated:
+            self.figure.draw_artist(a)
+        self.blit(self.figure.bbox)
 
 def clear_ax(ax):
     ax.clear()
     ax.set_facecolor("#ffffff")
 
-def draw_line_er_ctr(canvas: MplCanvas, days: int = 30, seed: int = 1):
-    import random
-    rng = random.Random(seed)
-    clear_ax(canvas.ax)
-    xs = list(range(1, days+1))
-    er = []
-    ctr = []
-    base_er = 0.06 + rng.uniform(-0.01, 0.01)
-    base_ctr = 0.035 + rng.uniform(-0.008, 0.008)
-    for i in xs:
-        base_er = min(0.14, max(0.03, base_er + rng.uniform(-0.004, 0.006)))
-        base_ctr = min(0.10, max(0.015, base_ctr + rng.uniform(-0.003, 0.004)))
-        er.append(base_er)
-        ctr.append(base_ctr)
-    canvas.ax.plot(xs, [v*100 for v in er], label="Engagement Rate (ER)")
-    canvas.ax.plot(xs, [v*100 for v in ctr], label="Click-Through Rate (CTR)")
-    canvas.ax.set_title("Динаміка залученості та кліків")
-    canvas.ax.set_xlabel("Дні")
-    canvas.ax.set_ylabel("Показник, %")
-    canvas.ax.grid(True, alpha=0.25)
-    canvas.ax.legend(loc="lower right", frameon=False)
-    canvas.draw()
+class TimeSeriesChart:
+    """ER/CTR history on an MplCanvas, drawn at screen resolution.
+
+    Only the visible time window is plotted, min/max decimated to about one
+    bucket per pixel column, so zooming in pulls in finer detail from the
+    full series. Wheel zooms around the cursor, drag pans, and a double
+    click resets the view. Appended points extend the lines in place; while
+    the view shows the latest point it scrolls along with new data.
+    """
+
+    def __init__(self, canvas: MplCanvas):
+        self.canvas = canvas
+        self.series: Optional[MetricSeries] = None
+        self._version = -1
+        self._drag: Optional[Tuple[float, Tuple[float, float]]] = None
+        ax = canvas.ax
+        clear_ax(ax)
+        self.er_line, = ax.plot([], [], label="Engagement Rate (ER)", linewidth=1)
+        self.ctr_line, = ax.plot([], [], label="Click-Through Rate (CTR)", linewidth=1)
+        ax.set_title("Динаміка залученості та кліків")
+        ax.set_ylabel("Показник, %")
+        ax.grid(True, alpha=0.25)
+        legend = ax.legend(loc="lower right", frameon=True, framealpha=0.85)
+        locator = mdates.AutoDateLocator()
+        ax.xaxis.set_major_locator(locator)
+        ax.xaxis.set_major_formatter(mdates.ConciseDateFormatter(locator))
+        # the legend is painted after the lines so they never cover it
+        canvas.set_animated([self.er_line, self.ctr_line, legend])
+
+        ax.callbacks.connect("xlim_changed", lambda _ax: self._update_lines())
+        canvas.mpl_connect("resize_event", lambda _e: self._update_lines())
+        canvas.mpl_connect("scroll_event", self._on_scroll)
+        canvas.mpl_connect("button_press_event", self._on_press)
+        canvas.mpl_connect("motion_notify_event", self._on_motion)
+        canvas.mpl_connect("button_release_event", self._on_release)
+
+    def set_series(self, series: MetricSeries) -> None:
+        if series is self.series and series.version == self._version:
+            return
+        self.series = series
+        self.reset_view()
+
+    def reset_view(self) -> None:
+        if self.series is None:
+            return
+        t0, t1 = self.series.span()
+        self._set_view(t0, t1 if t1 > t0 else t0 + 1.0)
+
+    def append(self, t, er, ctr) -> None:
+        s = self.series
+        if s is None:
+            self.set_series(MetricSeries(t, er, ctr))
+            return
+        lo, hi = self.canvas.ax.get_xlim()
+        following = len(s) > 0 and hi >= s.span()[1]
+        last = s.span()[1]
+        s.append(t, er, ctr)
+        if following:
+            shift = s.span()[1] - last
+            self._set_view(lo + shift, hi + shift)
+        elif self._update_lines(fit_y=False):
+            self.canvas.blit_update()
+
+    def _set_view(self, t0: float, t1: float) -> None:
+        self.canvas.ax.set_xlim(t0, t1)  # xlim_changed re-slices the lines
+        self.canvas.draw_idle()
+
+    def _update_lines(self, fit_y: bool = True) -> bool:
+        """Re-slice and decimate the visible window; True if it still fits the current y range."""
+        s = self.series
+        if s is None:
+            return False
+        self._version = s.version
+        ax = self.canvas.ax
+        t0, t1 = ax.get_xlim()
+        w = s.window(t0, t1)
+        buckets = max(int(ax.bbox.width), 1)
+        t = s.t[w]
+        er_x, er_y = minmax_decimate(t, s.er[w] * 100, buckets)
+        ctr_x, ctr_y = minmax_decimate(t, s.ctr[w] * 100, buckets)
+        self.er_line.set_data(er_x, er_y)
+        self.ctr_line.set_data(ctr_x, ctr_y)
+        if not (er_y.size or ctr_y.size):
+            return True
+        lo = min(er_y.min(initial=np.inf), ctr_y.min(initial=np.inf))
+        hi = max(er_y.max(initial=-np.inf), ctr_y.max(initial=-np.inf))
+        y0, y1 = ax.get_ylim()
+        if lo >= y0 and hi <= y1 and not fit_y:
+            return True
+        pad = max((hi - lo) * 0.08, 0.1)
+        ax.set_ylim(lo - pad, hi + pad)
+        return False
+
+    def _on_scroll(self, event) -> None:
+        if event.inaxes is not self.canvas.ax or event.xdata is None:
+            return
+        lo, hi = self.canvas.ax.get_xlim()
+        f = 0.8 if event.button == "up" else 1.25
+        x = event.xdata
+        self._set_view(x - (x - lo) * f, x + (hi - x) * f)
+
+    def _on_press(self, event) -> None:
+        if event.inaxes is not self.canvas.ax or event.button != 1:
+            return
+        if event.dblclick:
+            self.reset_view()
+            return
+        self._drag = (event.x, self.canvas.ax.get_xlim())
+
+    def _on_motion(self, event) -> None:
+        if self._drag is None or event.x is None:
+            return
+        x0, (lo, hi) = self._drag
+        shift = (event.x - x0) / max(self.canvas.ax.bbox.width, 1.0) * (hi - lo)
+        self._set_view(lo - shift, hi - shift)
+
+    def _on_release(self, event) -> None:
+        self._drag = None
 
 def draw_bar_topics(canvas: MplCanvas, labels: List[str], values: List[float]):
-    clear_ax(canvas.ax)
-    canvas.ax.bar(range(len(labels)), [v*100 for v in values])
-    canvas.ax.set_title("Топ тем за прогнозом ефективності")
-    canvas.ax.set_ylabel("Прогнозований ER, %")
-    canvas.ax.set_xticks(range(len(labels)))
-    canvas.ax.set_xticklabels(labels, rotation=25, ha="right")
-    canvas.ax.grid(True, axis="y", alpha=0.25)
-    canvas.draw()
+    if not canvas.data_changed(labels, values):
+        return
+    ax = canvas.ax
+    heights = [v*100 for v in values]
+    top = max(heights, default=1.0) * 1.15 or 1.0
+    bars = canvas.artists.get("bars")
+
+    if bars is None or len(bars) != len(labels):
+        clear_ax(ax)
+        bars = list(ax.bar(range(len(labels)), heights))
+        ax.set_title("Топ тем за прогнозом ефективності")
+        ax.set_ylabel("Прогнозований ER, %")
+        ax.set_xticks(range(len(labels)))
+        ax.set_xticklabels(labels, rotation=25, ha="right")
+        ax.grid(True, axis="y", alpha=0.25)
+        ax.set_ylim(0, top)
+        canvas.artists.update(bars=bars, labels=list(labels))
+        canvas.set_animated(bars)
+        canvas.draw_idle()
+        return
+
+    for b, h in zip(bars, heights):
+        b.set_height(h)
+    lo, hi = ax.get_ylim()
+    if list(labels) != canvas.artists["labels"] or top > hi or top < 0.5*hi:
+        # tick labels / axis range are part of the cached background
+        ax.set_xticklabels(labels, rotation=25, ha="right")
+        ax.set_ylim(0, top)
+        canvas.artists["labels"] = list(labels)
+        canvas.draw_idle()
+    else:
+        canvas.blit_update()
+
+def _wedge_angles(shares: List[float], startangle: float = 90.0) -> List[Tuple[float, float]]:
+    # same layout as ax.pie(normalize=True, counterclock=True): the shares always fill the ring
+    total = sum(shares)
+    scale = 1.0 / total if total > 0 else 0.0
+    out, theta = [], startangle
+    for s in shares:
+        out.append((theta, theta + 360.0*s*scale))
+        theta += 360.0*s*scale
+    return out
 
 def draw_donut_segments(canvas: MplCanvas, labels: List[str], shares: List[float]):
-    clear_ax(canvas.ax)
-    canvas.ax.set_title("Структура аудиторії")
-    wedges, _ = canvas.ax.pie(shares, labels=None, startangle=90, wedgeprops=dict(width=0.35))
-    canvas.ax.legend(wedges, labels, loc="center left", bbox_to_anchor=(1.02, 0.5), frameon=False)
-    canvas.draw()
+    if not canvas.data_changed(labels, shares):
+        return
+    wedges = canvas.artists.get("wedges")
+    if wedges is None or canvas.artists.get("labels") != list(labels):
+        clear_ax(canvas.ax)
+        canvas.ax.set_title("Структура аудиторії")
+        wedges, _ = canvas.ax.pie(shares, labels=None, startangle=90, normalize=True, wedgeprops=dict(width=0.35))
+        canvas.ax.legend(wedges, labels, loc="center left", bbox_to_anchor=(1.02, 0.5), frameon=False)
+        canvas.artists.update(wedges=list(wedges), labels=list(labels))
+        canvas.set_animated(list(wedges))
+        canvas.draw_idle()
+        return
+
+    for w, (t1, t2) in zip(wedges, _wedge_angles(shares)):
+        w.set_theta1(t1)
+        w.set_theta2(t2)
+    canvas.blit_update()
 
 def draw_radar_quality(canvas: MplCanvas, metrics: Dict[str, float]):
-    import numpy as np
+    if not canvas.data_changed(metrics):
+        return
     labels = list(metrics.keys())
     values = list(metrics.values())
     N = len(labels)
-    clear_ax(canvas.ax)
-    canvas.figure.clf()
-    ax = canvas.figure.add_subplot(111, polar=True)
     angles = np.linspace(0, 2*np.pi, N, endpoint=False).tolist()
     values2 = values + values[:1]
     angles2 = angles + angles[:1]
-    ax.plot(angles2, values2, linewidth=2)
-    ax.fill(angles2, values2, alpha=0.15)
-    ax.set_xticks(angles)
-    ax.set_xticklabels(labels)
-    ax.set_yticks([0.25, 0.5, 0.75, 1.0])
-    ax.set_yticklabels(["0.25", "0.5", "0.75", "1.0"])
-    ax.set_title("Профіль якості рекомендацій", pad=14)
-    canvas.draw()
\ No newline at end of file
+
+    if canvas.artists.get("labels") != labels:
+        # polar axis is created once per set of axes labels
+        canvas.figure.clf()
+        ax = canvas.figure.add_subplot(111, polar=True)
+        canvas.ax = ax
+        line, = ax.plot(angles2, values2, linewidth=2)
+        poly, = ax.fill(angles2, values2, alpha=0.15)
+        ax.set_xticks(angles)
+        ax.set_xticklabels(labels)
+        ax.set_ylim(0, 1.0)
+        ax.set_yticks([0.25, 0.5, 0.75, 1.0])
+        ax.set_yticklabels(["0.25", "0.5", "0.75", "1.0"])
+        ax.set_title("Профіль якості рекомендацій", pad=14)
+        canvas.artists.update(line=line, poly=poly, labels=labels)
+        canvas.set_animated([poly, line])
+        canvas.draw_idle()
+        return
+
+    canvas.artists["line"].set_data(angles2, values2)
+    canvas.artists["poly"].set_xy(np.column_stack([angles2, values2]))
+    canvas.blit_update()
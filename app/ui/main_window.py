@@ -1,21 +1,30 @@
 from __future__ import annotations
 import os
 import datetime as dt
-from typing import List, Dict
+from typing import List, Dict, Optional
 
 import pandas as pd
-from PyQt6.QtCore import Qt, QUrl
+from PyQt6.QtCore import Qt, QUrl, QTimer
 from PyQt6.QtGui import QDesktopServices
 from PyQt6.QtWidgets import (
     QMainWindow, QWidget, QHBoxLayout, QVBoxLayout, QFrame, QLabel, QPushButton,
-    QStackedWidget, QTableWidget, QTableWidgetItem, QHeaderView, QLineEdit,
-    QComboBox, QDateEdit, QMessageBox, QSizePolicy, QAbstractItemView
+    QStackedWidget, QTableView, QHeaderView, QLineEdit,
+    QComboBox, QDateEdit, QMessageBox, QSizePolicy, QAbstractItemView, QApplication
 )
 
-from app.ui.charts import MplCanvas, draw_line_er_ctr, draw_bar_topics, draw_donut_segments, draw_radar_quality
-from app.services.recommender import RecommenderEngine, TopicRec
-from app.services.reporting import ReportService
-from app.data.sample_data import make_demo_segments
+from app.ui.charts import MplCanvas, TimeSeriesChart, draw_bar_topics, draw_donut_segments, draw_radar_quality
+from app.services.recommender import HORIZONS, PLATFORMS, RecommenderEngine, TopicRec
+from app.services.reporting import FORMATS, STATUS_FAILED, STATUS_READY, PENDING_STATUSES, ReportEntry, ReportService
+from app.services.report_snapshot import ReportSnapshot
+from app.services.search_index import SearchIndex
+from app.ui.workers import TaskRunner
+from app.startup import STARTUP, print_report
+from app.ui.table_models import (
+    ROW_ROLE, ButtonDelegate, recs_model, reports_model, segments_model, top_model
+)
+from app.data.sample_data import AudienceSegment, make_demo_segments
+from app.data.catalog_loader import load_metric_history, load_segments
+from app.data.metric_series import MetricSeries, make_demo_history
 
 def _chip(label: str, kind: str = "info") -> QLabel:
     q = QLabel(label)
@@ -29,19 +38,51 @@ def _chip(label: str, kind: str = "info") -> QLabel:
     return q
 
 class MainWindow(QMainWindow):
-    def __init__(self, user_name: str, qss_path: str, reports_dir: str):
+    def __init__(self, user_name: str, qss_path: str, reports_dir: str, models_dir: Optional[str] = None,
+                 catalog_path: Optional[str] = None, segments_path: Optional[str] = None,
+                 history_path: Optional[str] = None):
         super().__init__()
         self.user_name = user_name
+        self.segments_path = segments_path
         self.setWindowTitle("Рекомендаційна система тем контенту — Author Cabinet (PyQt6)")
         self.resize(1280, 780)
 
-        self.engine = RecommenderEngine(seed=42)
+        self.engine: Optional[RecommenderEngine] = None
+        self._data_seed = 0  # snapshot the engine scores; "Оновити" moves to the next one
+        self.recs: List[TopicRec] = []
+        self.search_index = SearchIndex([])
+        self.segs: List[AudienceSegment] = []
+        self.kpi: Dict[str, float] = {}
+        self.history: Optional[MetricSeries] = None
+        self._snapshot: Optional[ReportSnapshot] = None  # taken on the first export after each refresh
+        self.seg_df = pd.DataFrame(columns=["Сегмент", "Частка", "Фокус інтересу"])
+        # per-page data version vs. the version last rendered; pages are rendered lazily in _go
+        self._page = "overview"
+        self._data_version = {"overview": 0, "analytics": 0, "reports": 0}
+        self._rendered_version = dict(self._data_version)
         self.reporter = ReportService(reports_dir)
+        # report jobs render in worker processes; their statuses are polled while any is pending
+        self.report_timer = QTimer(self)
+        self.report_timer.setInterval(250)
+        self.report_timer.timeout.connect(self._poll_reports)
+        app = QApplication.instance()
+        if app is not None:
+            app.aboutToQuit.connect(self.reporter.shutdown)
+        self.worker = TaskRunner(self)
+        self.worker.busy_changed.connect(self._on_busy)
+        self.loader = TaskRunner(self)  # file loads, so they do not queue behind engine construction
 
         self._load_qss(qss_path)
         self._build()
 
-        self._refresh_all()
+        def build_engine():
+            with STARTUP.phase("RecommenderEngine()"):
+                return RecommenderEngine(seed=42, models_dir=models_dir, catalog_path=catalog_path)
+
+        # Models are loaded/trained off the GUI thread; the first refresh follows
+        self.worker.submit("engine", build_engine, self._on_engine_ready, self._on_task_error)
+        self.loader.submit("history", lambda: load_metric_history(history_path) if history_path else make_demo_history(),
+                           self._on_history_ready, self._on_task_error)
 
     def _load_qss(self, qss_path: str):
         try:
@@ -157,10 +198,13 @@ class MainWindow(QMainWindow):
         controls = QHBoxLayout()
         self.search = QLineEdit()
         self.search.setPlaceholderText("Пошук теми або ключового слова")
-        self.platform = QComboBox(); self.platform.addItems(["усі", "Instagram", "TikTok", "YouTube"])
-        self.horizon = QComboBox(); self.horizon.addItems(["7 днів", "14 днів", "30 днів"])
+        self.platform = QComboBox(); self.platform.addItems(list(PLATFORMS))
+        self.horizon = QComboBox(); self.horizon.addItems([f"{h} днів" for h in HORIZONS])
         refresh = QPushButton("Оновити")
-        refresh.clicked.connect(self._refresh_all)
+        refresh.clicked.connect(lambda: self._refresh_all(new_data=True))
+        # every platform × horizon is scored with the data, so switching is a lookup
+        self.platform.currentIndexChanged.connect(lambda _: self._refresh_all())
+        self.horizon.currentIndexChanged.connect(lambda _: self._refresh_all())
         controls.addWidget(self.search, 2)
         controls.addWidget(QLabel("Платформа:"), 0)
         controls.addWidget(self.platform, 0)
@@ -168,8 +212,15 @@ class MainWindow(QMainWindow):
         controls.addWidget(self.horizon, 0)
         controls.addWidget(refresh, 0)
 
-        self.tbl_recs = QTableWidget(0, 7)
-        self.tbl_recs.setHorizontalHeaderLabels(["№", "Тема", "Ключові\nдрайвери", "Прогноз\nER", "Тренд", "Пояснюваність", "Статус"])
+        self.recs_model = recs_model(self)
+        # search is debounced: the index is queried once typing pauses
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(120)
+        self.search_timer.timeout.connect(self._apply_search)
+        self.search.textChanged.connect(self.search_timer.start)
+        self.tbl_recs = QTableView()
+        self.tbl_recs.setModel(self.recs_model)
         self.tbl_recs.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.ResizeToContents)
         self.tbl_recs.horizontalHeader().setSectionResizeMode(1, QHeaderView.ResizeMode.Stretch)
         self.tbl_recs.horizontalHeader().setSectionResizeMode(2, QHeaderView.ResizeMode.ResizeToContents)
@@ -179,7 +230,7 @@ class MainWindow(QMainWindow):
         self.tbl_recs.horizontalHeader().setSectionResizeMode(6, QHeaderView.ResizeMode.ResizeToContents)
         self.tbl_recs.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
         self.tbl_recs.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
-        self.tbl_recs.itemSelectionChanged.connect(self._on_rec_selected)
+        self.tbl_recs.selectionModel().selectionChanged.connect(self._on_rec_selected)
 
         l.addWidget(head)
         l.addLayout(controls)
@@ -252,15 +303,16 @@ class MainWindow(QMainWindow):
         l = QVBoxLayout(left); l.setContentsMargins(14, 14, 14, 14); l.setSpacing(10)
 
         self.line_canvas = MplCanvas()
-        draw_line_er_ctr(self.line_canvas, days=30, seed=4)
+        self.line_chart = TimeSeriesChart(self.line_canvas)
 
         l.addWidget(self.line_canvas, 1)
 
         self.bar_canvas = MplCanvas()
         l.addWidget(self.bar_canvas, 1)
 
-        self.tbl_top = QTableWidget(0, 4)
-        self.tbl_top.setHorizontalHeaderLabels(["№", "Тема", "Прогноз ER", "Рекоменд. формат"])
+        self.top_model = top_model(self)
+        self.tbl_top = QTableView()
+        self.tbl_top.setModel(self.top_model)
         self.tbl_top.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.ResizeToContents)
         self.tbl_top.horizontalHeader().setSectionResizeMode(1, QHeaderView.ResizeMode.Stretch)
         self.tbl_top.horizontalHeader().setSectionResizeMode(2, QHeaderView.ResizeMode.ResizeToContents)
@@ -275,8 +327,9 @@ class MainWindow(QMainWindow):
         self.donut_canvas = MplCanvas()
         r.addWidget(self.donut_canvas, 1)
 
-        self.seg_table = QTableWidget(0, 3)
-        self.seg_table.setHorizontalHeaderLabels(["Сегмент", "Частка", "Фокус інтересу"])
+        self.seg_model = segments_model(self)
+        self.seg_table = QTableView()
+        self.seg_table.setModel(self.seg_model)
         self.seg_table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.ResizeToContents)
         self.seg_table.horizontalHeader().setSectionResizeMode(1, QHeaderView.ResizeMode.ResizeToContents)
         self.seg_table.horizontalHeader().setSectionResizeMode(2, QHeaderView.ResizeMode.Stretch)
@@ -314,10 +367,13 @@ class MainWindow(QMainWindow):
         today = dt.date.today()
         self.date_to.setDate(today)
         self.date_from.setDate(today - dt.timedelta(days=30))
-        self.fmt = QComboBox(); self.fmt.addItems(["PDF", "CSV", "HTML"])
+        self.fmt = QComboBox(); self.fmt.addItems(list(FORMATS))
 
         build_btn = QPushButton("Сформувати")
         build_btn.clicked.connect(self._build_report)
+        batch_btn = QPushButton("Пакетний експорт")
+        batch_btn.setObjectName("Secondary")
+        batch_btn.clicked.connect(self._build_batch)
         preview_btn = QPushButton("Попередній перегляд")
         preview_btn.setObjectName("Secondary")
         preview_btn.clicked.connect(self._preview_last)
@@ -329,6 +385,7 @@ class MainWindow(QMainWindow):
         form.addWidget(QLabel("Формат:"))
         form.addWidget(self.fmt, 0)
         form.addWidget(build_btn, 0)
+        form.addWidget(batch_btn, 0)
         form.addWidget(preview_btn, 0)
 
         l.addWidget(h)
@@ -337,14 +394,21 @@ class MainWindow(QMainWindow):
         # Report log
         l.addWidget(QLabel("Журнал сформованих звітів"), 0)
 
-        self.tbl_reports = QTableWidget(0, 6)
-        self.tbl_reports.setHorizontalHeaderLabels(["№", "Назва звіту", "Період", "Формат", "Дата/час", "Дія"])
+        self.reports_model = reports_model(self)
+        self.tbl_reports = QTableView()
+        self.tbl_reports.setModel(self.reports_model)
+        # one painted button delegate for the whole column instead of a QPushButton per row
+        self.open_delegate = ButtonDelegate(self.tbl_reports)
+        self.open_delegate.clicked.connect(lambda idx: self._on_report_action(idx.data(ROW_ROLE)))
+        self.tbl_reports.setItemDelegateForColumn(6, self.open_delegate)
+        self.tbl_reports.setMouseTracking(True)
         self.tbl_reports.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.ResizeToContents)
         self.tbl_reports.horizontalHeader().setSectionResizeMode(1, QHeaderView.ResizeMode.Stretch)
         self.tbl_reports.horizontalHeader().setSectionResizeMode(2, QHeaderView.ResizeMode.ResizeToContents)
         self.tbl_reports.horizontalHeader().setSectionResizeMode(3, QHeaderView.ResizeMode.ResizeToContents)
         self.tbl_reports.horizontalHeader().setSectionResizeMode(4, QHeaderView.ResizeMode.ResizeToContents)
         self.tbl_reports.horizontalHeader().setSectionResizeMode(5, QHeaderView.ResizeMode.ResizeToContents)
+        self.tbl_reports.horizontalHeader().setSectionResizeMode(6, QHeaderView.ResizeMode.ResizeToContents)
         self.tbl_reports.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
         l.addWidget(self.tbl_reports, 1)
 
@@ -388,24 +452,80 @@ class MainWindow(QMainWindow):
             self.pages.setCurrentWidget(self.page_analytics)
         elif key == "reports":
             self.pages.setCurrentWidget(self.page_reports)
+        self._page = key
+        self._render_page(key)
+
+    def _invalidate(self, *pages: str):
+        for key in pages:
+            self._data_version[key] += 1
+        if self._page in pages:
+            self._render_page(self._page)
+
+    def _render_page(self, key: str):
+        version = self._data_version[key]
+        if self._rendered_version[key] == version:
+            return
+        self._rendered_version[key] = version
+        if key == "overview":
+            self._apply_search()
+            self._set_kpis(self.kpi, "overview")
+        elif key == "analytics":
+            self._fill_analytics(self.recs, self.segs)
+        elif key == "reports":
+            self._fill_report_log()
 
     # ---------- Data refresh ----------
-    def _refresh_all(self):
-        # horizon
-        horizon_text = self.horizon.currentText() if hasattr(self, "horizon") else "7 днів"
-        days = int(horizon_text.split()[0])
-        platform = self.platform.currentText() if hasattr(self, "platform") else "усі"
-        self.recs, kpi = self.engine.recommend(horizon_days=days, platform=platform, top_k=6)
-        self._fill_overview_table(self.recs)
-        self._set_kpis(kpi)
+    def _on_engine_ready(self, engine: RecommenderEngine):
+        self.engine = engine
+        self._refresh_all()
+
+    def _on_history_ready(self, history: MetricSeries):
+        self.history = history
+        self._invalidate("analytics")
+
+    def _on_busy(self, busy: bool):
+        self.model_chip.setText("Модель: Hybrid NLP + Trends · оновлення…" if busy else "Модель: Hybrid NLP + Trends")
 
-        # analytics derived from recs
-        self._fill_analytics(self.recs)
+    def _on_task_error(self, message: str):
+        QMessageBox.critical(self, "Помилка", message)
+
+    def _refresh_all(self, new_data: bool = False):
+        if self.engine is None:
+            return  # the engine task triggers the first refresh when it is ready
+        # horizon
+        days = int(self.horizon.currentText().split()[0])
+        platform = self.platform.currentText()
+        engine, segments_path = self.engine, self.segments_path
+
+        if new_data:
+            self._data_seed += 1
+        seed = self._data_seed
+
+        def job():
+            recs, kpi = engine.recommend(horizon_days=days, platform=platform, top_k=6, seed=seed)
+            segs = load_segments(segments_path) if segments_path else make_demo_segments(seed=11)
+            index = SearchIndex([f"{r.topic}\n{r.drivers}\n{r.explain}" for r in recs])
+            return recs, kpi, segs, index
+
+        # a newer click supersedes a refresh that is still queued or running
+        self.worker.submit("refresh", job, self._apply_refresh, self._on_task_error)
+
+    def _apply_refresh(self, result):
+        self.recs, self.kpi, self.segs, self.search_index = result
+        self._snapshot = None
+        self.seg_df = pd.DataFrame([{
+            "Сегмент": s.name,
+            "Частка": round(s.share*100),
+            "Фокус інтересу": s.focus
+        } for s in self.segs])
+        # only the visible page is rendered now; the others catch up when shown
+        self._invalidate("overview", "analytics")
 
-        # reports table refresh
-        self._fill_report_log()
+        if not STARTUP.has_mark("dashboard ready"):
+            STARTUP.mark("dashboard ready")
+            print_report()
 
-    def _set_kpis(self, kpi: Dict[str, float]):
+    def _set_kpis(self, kpi: Dict[str, float], page: str):
         def set_card(card: QFrame, value: str, delta: str = ""):
             # second widget in layout is value label
             v = card.layout().itemAt(1).widget()
@@ -413,92 +533,66 @@ class MainWindow(QMainWindow):
             if delta:
                 card.layout().itemAt(2).widget().setText(delta)
 
-        set_card(self.kpi_ctr, f"{kpi.get('ctr',0)*100:.1f}%")
-        set_card(self.kpi_er, f"{kpi.get('er',0)*100:.1f}%")
-        set_card(self.kpi_trends, f"{int(kpi.get('trends',0))}")
-        set_card(self.kpi_f1, f"{kpi.get('f1',0):.2f}")
-
-        set_card(self.kpi2_er, f"{kpi.get('er',0)*100:.1f}%")
-        set_card(self.kpi2_ctr, f"{kpi.get('ctr',0)*100:.1f}%")
-        set_card(self.kpi2_topics, f"{len(self.recs)*2}")
-        set_card(self.kpi2_f1, f"{kpi.get('f1',0):.2f}")
-
-    def _fill_overview_table(self, recs: List[TopicRec]):
-        self.tbl_recs.setRowCount(0)
-        q = self.search.text().strip().lower()
-        for r in recs:
-            if q and (q not in r.topic.lower() and q not in r.drivers.lower() and q not in r.explain.lower()):
-                continue
-            row = self.tbl_recs.rowCount()
-            self.tbl_recs.insertRow(row)
-            self.tbl_recs.setItem(row, 0, QTableWidgetItem(str(row+1)))
-            self.tbl_recs.setItem(row, 1, QTableWidgetItem(r.topic))
-            self.tbl_recs.setItem(row, 2, QTableWidgetItem(r.drivers))
-            self.tbl_recs.setItem(row, 3, QTableWidgetItem(f\"{r.er_pred*100:.1f}%\"))
-            self.tbl_recs.setItem(row, 4, QTableWidgetItem(r.trend))
-            self.tbl_recs.setItem(row, 5, QTableWidgetItem(r.explain))
-            self.tbl_recs.setItem(row, 6, QTableWidgetItem(r.status))
-
-        if self.tbl_recs.rowCount() > 0:
+        if page == "analytics":
+            set_card(self.kpi2_er, f"{kpi.get('er',0)*100:.1f}%")
+            set_card(self.kpi2_ctr, f"{kpi.get('ctr',0)*100:.1f}%")
+            set_card(self.kpi2_topics, f"{len(self.recs)*2}")
+            set_card(self.kpi2_f1, f"{kpi.get('f1',0):.2f}")
+        else:
+            set_card(self.kpi_ctr, f"{kpi.get('ctr',0)*100:.1f}%")
+            set_card(self.kpi_er, f"{kpi.get('er',0)*100:.1f}%")
+            set_card(self.kpi_trends, f"{int(kpi.get('trends',0))}")
+            set_card(self.kpi_f1, f"{kpi.get('f1',0):.2f}")
+
+    def _apply_search(self):
+        self.search_timer.stop()
+        hits = self.search_index.search(self.search.text())
+        self.recs_model.set_rows(self.recs if len(hits) == len(self.recs) else [self.recs[i] for i in hits.tolist()])
+        if self.recs_model.rowCount() > 0:
             self.tbl_recs.selectRow(0)
 
-    def _on_rec_selected(self):
-        items = self.tbl_recs.selectedItems()
-        if not items:
-            return
-        row = self.tbl_recs.currentRow()
-        # map selected row to recs by row index (after filtering may differ)
-        topic = self.tbl_recs.item(row, 1).text()
-        rec = next((x for x in self.recs if x.topic == topic), None)
+    def _selected_rec(self) -> Optional[TopicRec]:
+        idx = self.tbl_recs.currentIndex()
+        if not idx.isValid() or not self.tbl_recs.selectionModel().hasSelection():
+            return None
+        return idx.data(ROW_ROLE)
+
+    def _on_rec_selected(self, *_):
+        rec = self._selected_rec()
         if not rec:
             return
         # Build a short forecast similar to screenshot
         # heuristics
         fmt = "short / карусель" if rec.ctr_pred > 0.055 else "гайд 30–45 с"
         peak = "12:00–14:00 / 19:00–21:00"
-        ab = f\"Заплановано A/B: '{rec.topic}' vs 'Короткі навчальні формати'\"
+        ab = f"Заплановано A/B: '{rec.topic}' vs 'Короткі навчальні формати'"
 
         text = (
-            f\"• Оптимальний формат: {fmt}\\n\"
-            f\"• Рекомендовані вікна публікацій: {peak}\\n\"
-            f\"• Прогноз ER у день: {rec.er_pred*100:.1f}%\\n\"
-            f\"• Прогноз CTR у день: {rec.ctr_pred*100:.1f}%\\n\"
-            f\"• Пояснюваність: {rec.explain}\\n\"
-            f\"• Статус: {rec.status} (тренд: {rec.trend})\"
+            f"• Оптимальний формат: {fmt}\n"
+            f"• Рекомендовані вікна публікацій: {peak}\n"
+            f"• Прогноз ER у день: {rec.er_pred*100:.1f}%\n"
+            f"• Прогноз CTR у день: {rec.ctr_pred*100:.1f}%\n"
+            f"• Пояснюваність: {rec.explain}\n"
+            f"• Статус: {rec.status} (тренд: {rec.trend})"
         )
         self.short_forecast.setText(text)
 
-    def _fill_analytics(self, recs: List[TopicRec]):
+    def _fill_analytics(self, recs: List[TopicRec], segs: List[AudienceSegment]):
+        if self.history is not None:
+            self.line_chart.set_series(self.history)
+        if not recs:
+            return  # history can arrive before the first refresh
+
         # bar chart
         labels = [r.topic.split()[0] if len(r.topic) > 18 else r.topic for r in recs]
         values = [r.er_pred for r in recs]
         draw_bar_topics(self.bar_canvas, labels, values)
 
         # top table
-        self.tbl_top.setRowCount(0)
-        for i, r in enumerate(recs, start=1):
-            row = self.tbl_top.rowCount()
-            self.tbl_top.insertRow(row)
-            self.tbl_top.setItem(row, 0, QTableWidgetItem(str(i)))
-            self.tbl_top.setItem(row, 1, QTableWidgetItem(r.topic))
-            self.tbl_top.setItem(row, 2, QTableWidgetItem(f\"{r.er_pred*100:.1f}%\"))
-            fmt = "short / карусель" if r.ctr_pred > 0.055 else "гайд 30–45 с"
-            self.tbl_top.setItem(row, 3, QTableWidgetItem(fmt))
+        self.top_model.set_rows(recs)
 
         # segments
-        segs = make_demo_segments(seed=11)
-        self.seg_df = pd.DataFrame([{
-            "Сегмент": s.name,
-            "Частка": round(s.share*100),
-            "Фокус інтересу": s.focus
-        } for s in segs])
-        self.seg_table.setRowCount(0)
-        for _, rowv in self.seg_df.iterrows():
-            row = self.seg_table.rowCount()
-            self.seg_table.insertRow(row)
-            self.seg_table.setItem(row, 0, QTableWidgetItem(str(rowv["Сегмент"])))
-            self.seg_table.setItem(row, 1, QTableWidgetItem(f\"{int(rowv['Частка'])}%\"))
-            self.seg_table.setItem(row, 2, QTableWidgetItem(str(rowv["Фокус інтересу"])))
+        self.seg_model.set_rows(segs)
 
         # donut
         draw_donut_segments(self.donut_canvas, [s.name for s in segs], [s.share for s in segs])
@@ -513,44 +607,61 @@ class MainWindow(QMainWindow):
             "Різноманітність": 0.68,
         }
         draw_radar_quality(self.radar_canvas, metrics)
+        self._set_kpis(self.kpi, "analytics")
 
     # ---------- Reports ----------
-    def _build_report(self):
-        try:
-            template = self.tpl.currentText()
-            d1 = self.date_from.date().toPyDate()
-            d2 = self.date_to.date().toPyDate()
-            fmt = self.fmt.currentText()
-            # Ensure data exists
-            if not hasattr(self, "recs"):
-                self._refresh_all()
-            entry = self.reporter.build(template, d1, d2, fmt, self.recs, {
+    def _report_snapshot(self) -> ReportSnapshot:
+        if self._snapshot is None:
+            kpi = {
                 "ctr": sum([r.ctr_pred for r in self.recs]) / max(1, len(self.recs)),
                 "er": sum([r.er_pred for r in self.recs]) / max(1, len(self.recs)),
                 "trends": len([r for r in self.recs if r.trend == "зростає"]),
                 "f1": 0.82,
-            }, self.seg_df)
-            self._fill_report_log()
-            QMessageBox.information(self, "Звіт сформовано", f"Файл: {os.path.basename(entry.filepath)}")
+            }
+            self._snapshot = ReportSnapshot.from_recs(self.recs, kpi, self.seg_df)
+        return self._snapshot
+
+    def _build_report(self):
+        self._submit_reports([self.tpl.currentText()], [self.fmt.currentText()])
+
+    def _build_batch(self):
+        # every template as CSV and HTML, plus one merged PDF
+        templates = [self.tpl.itemText(i) for i in range(self.tpl.count())]
+        self._submit_reports(templates, ["PDF", "CSV", "HTML"])
+
+    def _submit_reports(self, templates: List[str], fmts: List[str]):
+        if not self.recs:
+            QMessageBox.information(self, "Дані завантажуються", "Зачекайте завершення оновлення рекомендацій.")
+            return
+        try:
+            d1, d2 = self.date_from.date().toPyDate(), self.date_to.date().toPyDate()
+            self.reporter.submit_batch(templates, d1, d2, fmts, self._report_snapshot(), merge_pdf=True)
         except Exception as e:
             QMessageBox.critical(self, "Помилка", str(e))
+            return
+        self._invalidate("reports")
+        self.report_timer.start()
+
+    def _poll_reports(self):
+        changed = self.reporter.poll()
+        if not self.reporter.pending():
+            self.report_timer.stop()
+        if changed:
+            self._invalidate("reports")
+        failed = [e for e in changed if e.status == STATUS_FAILED]
+        if failed:
+            QMessageBox.critical(self, "Помилка", "\n".join(f"{e.title} ({e.fmt}): {e.error}" for e in failed))
+
+    def _on_report_action(self, entry: ReportEntry):
+        if entry.status in PENDING_STATUSES:
+            self.reporter.cancel(entry.rid)
+            self._invalidate("reports")
+        elif entry.status == STATUS_READY:
+            self._open_file(entry.filepath)
 
     def _fill_report_log(self):
-        entries = self.reporter.entries()
-        self.tbl_reports.setRowCount(0)
-        for e in entries:
-            row = self.tbl_reports.rowCount()
-            self.tbl_reports.insertRow(row)
-            self.tbl_reports.setItem(row, 0, QTableWidgetItem(str(e.rid)))
-            self.tbl_reports.setItem(row, 1, QTableWidgetItem(e.title))
-            self.tbl_reports.setItem(row, 2, QTableWidgetItem(e.period))
-            self.tbl_reports.setItem(row, 3, QTableWidgetItem(e.fmt))
-            self.tbl_reports.setItem(row, 4, QTableWidgetItem(e.created_at.strftime("%d.%m %H:%M")))
-
-            btn = QPushButton("відкрити")
-            btn.setObjectName("Secondary")
-            btn.clicked.connect(lambda _, p=e.filepath: self._open_file(p))
-            self.tbl_reports.setCellWidget(row, 5, btn)
+        # the log is paged in from the registry as the table scrolls
+        self.reports_model.set_source(self.reporter.count(), self.reporter.entries)
 
     def _open_file(self, path: str):
         if not os.path.exists(path):
@@ -559,11 +670,11 @@ class MainWindow(QMainWindow):
         QDesktopServices.openUrl(QUrl.fromLocalFile(path))
 
     def _preview_last(self):
-        entries = self.reporter.entries()
-        if not entries:
+        ready = [e for e in self.reporter.entries() if e.status == STATUS_READY]
+        if not ready:
             QMessageBox.information(self, "Немає звітів", "Спочатку сформуйте звіт.")
             return
-        self._open_file(entries[0].filepath)
+        self._open_file(ready[0].filepath)
 
     # ---------- A/B + Planner (demo) ----------
     def _ab_test(self):
@@ -574,11 +685,11 @@ class MainWindow(QMainWindow):
         )
 
     def _planner_add(self):
-        items = self.tbl_recs.selectedItems()
-        if not items:
+        rec = self._selected_rec()
+        if not rec:
             QMessageBox.information(self, "Планувальник", "Оберіть тему в таблиці.")
             return
-        topic = self.tbl_recs.item(self.tbl_recs.currentRow(), 1).text()
+        topic = rec.topic
         QMessageBox.information(
             self, "Планувальник (демо)",
             f"Тема додана у план публікацій: {topic}\n"
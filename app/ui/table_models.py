@@ -0,0 +1,144 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING, Any, Callable, List, Optional, Sequence, Tuple
+
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex, QEvent, pyqtSignal
+from PyQt6.QtWidgets import QStyledItemDelegate, QStyleOptionButton, QStyle, QApplication
+
+from app.services.reporting import PENDING_STATUSES, STATUS_READY
+
+if TYPE_CHECKING:
+    from app.services.recommender import TopicRec
+
+# (header, formatter) per column; formatters run only for cells the view asks about
+Column = Tuple[str, Callable[[int, Any], str]]
+
+ROW_ROLE = Qt.ItemDataRole.UserRole
+
+def _fmt_format(r: TopicRec) -> str:
+    return "short / карусель" if r.ctr_pred > 0.055 else "гайд 30–45 с"
+
+class RowTableModel(QAbstractTableModel):
+    """Read-only table over a list of row objects; cells are formatted on demand."""
+
+    def __init__(self, columns: Sequence[Column], parent=None):
+        super().__init__(parent)
+        self.columns = list(columns)
+        self.rows: List[Any] = []
+
+    def set_rows(self, rows: List[Any]) -> None:
+        self.beginResetModel()
+        self.rows = rows
+        self.endResetModel()
+
+    def row_at(self, row: int) -> Optional[Any]:
+        return self.rows[row] if 0 <= row < len(self.rows) else None
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.columns)
+
+    def data(self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == Qt.ItemDataRole.DisplayRole:
+            return self.columns[index.column()][1](index.row(), self.rows[index.row()])
+        if role == ROW_ROLE:
+            return self.rows[index.row()]
+        return None
+
+    def headerData(self, section: int, orientation: Qt.Orientation, role: int = Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return self.columns[section][0]
+        return super().headerData(section, orientation, role)
+
+class PagedTableModel(RowTableModel):
+    """RowTableModel that pulls rows a page at a time as the view scrolls (canFetchMore / fetchMore)."""
+
+    def __init__(self, columns: Sequence[Column], page_size: int = 200, parent=None):
+        super().__init__(columns, parent)
+        self.page_size = page_size
+        self._total = 0
+        self._fetch: Optional[Callable[[int, int], List[Any]]] = None
+
+    def set_source(self, total: int, fetch: Callable[[int, int], List[Any]]) -> None:
+        """Reload from fetch(offset, limit), keeping as many rows loaded as before."""
+        self._total, self._fetch = total, fetch
+        self.set_rows(fetch(0, min(max(len(self.rows), self.page_size), total)))
+
+    def canFetchMore(self, parent: QModelIndex = QModelIndex()) -> bool:
+        return not parent.isValid() and self._fetch is not None and len(self.rows) < self._total
+
+    def fetchMore(self, parent: QModelIndex = QModelIndex()) -> None:
+        start = len(self.rows)
+        more = self._fetch(start, min(self.page_size, self._total - start))
+        if not more:
+            self._total = start
+            return
+        self.beginInsertRows(QModelIndex(), start, start + len(more) - 1)
+        self.rows.extend(more)
+        self.endInsertRows()
+
+def recs_model(parent=None) -> RowTableModel:
+    return RowTableModel([
+        ("№", lambda i, r: str(i+1)),
+        ("Тема", lambda i, r: r.topic),
+        ("Ключові\nдрайвери", lambda i, r: r.drivers),
+        ("Прогноз\nER", lambda i, r: f"{r.er_pred*100:.1f}%"),
+        ("Тренд", lambda i, r: r.trend),
+        ("Пояснюваність", lambda i, r: r.explain),
+        ("Статус", lambda i, r: r.status),
+    ], parent)
+
+def top_model(parent=None) -> RowTableModel:
+    return RowTableModel([
+        ("№", lambda i, r: str(i+1)),
+        ("Тема", lambda i, r: r.topic),
+        ("Прогноз ER", lambda i, r: f"{r.er_pred*100:.1f}%"),
+        ("Рекоменд. формат", lambda i, r: _fmt_format(r)),
+    ], parent)
+
+def segments_model(parent=None) -> RowTableModel:
+    return RowTableModel([
+        ("Сегмент", lambda i, s: s.name),
+        ("Частка", lambda i, s: f"{round(s.share*100)}%"),
+        ("Фокус інтересу", lambda i, s: s.focus),
+    ], parent)
+
+def reports_model(parent=None) -> PagedTableModel:
+    return PagedTableModel([
+        ("№", lambda i, e: str(e.rid)),
+        ("Назва звіту", lambda i, e: e.title),
+        ("Період", lambda i, e: e.period),
+        ("Формат", lambda i, e: e.fmt),
+        ("Дата/час", lambda i, e: e.created_at.strftime("%d.%m %H:%M")),
+        ("Статус", lambda i, e: e.status),
+        ("Дія", lambda i, e: _report_action(e)),
+    ], parent=parent)
+
+def _report_action(e) -> str:
+    if e.status in PENDING_STATUSES:
+        return "скасувати"
+    return "відкрити" if e.status == STATUS_READY else "—"
+
+class ButtonDelegate(QStyledItemDelegate):
+    """Paints a push button in the cell and reports clicks, instead of one QPushButton widget per row."""
+    clicked = pyqtSignal(QModelIndex)
+
+    def paint(self, painter, option, index: QModelIndex) -> None:
+        btn = QStyleOptionButton()
+        btn.rect = option.rect.adjusted(4, 3, -4, -3)
+        btn.text = str(index.data(Qt.ItemDataRole.DisplayRole) or "")
+        btn.state = QStyle.StateFlag.State_Enabled
+        if option.state & QStyle.StateFlag.State_MouseOver:
+            btn.state |= QStyle.StateFlag.State_MouseOver
+        style = option.widget.style() if option.widget is not None else QApplication.style()
+        style.drawControl(QStyle.ControlElement.CE_PushButton, btn, painter, option.widget)
+
+    def editorEvent(self, event, model, option, index: QModelIndex) -> bool:
+        if event.type() == QEvent.Type.MouseButtonRelease and event.button() == Qt.MouseButton.LeftButton:
+            if option.rect.contains(event.position().toPoint()):
+                self.clicked.emit(index)
+                return True
+        return super().editorEvent(event, model, option, index)
@@ -0,0 +1,109 @@
+from __future__ import annotations
+import traceback
+from typing import Any, Callable, Dict, Optional
+
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal, pyqtSlot
+
+class _TaskSignals(QObject):
+    finished = pyqtSignal(str, int, object)  # channel, generation, result
+    failed = pyqtSignal(str, int, str)
+
+class _Task(QRunnable):
+    def __init__(self, channel: str, generation: int, fn: Callable[[], Any]):
+        super().__init__()
+        self.setAutoDelete(False)  # kept alive by TaskRunner until it reports back
+        self.channel = channel
+        self.generation = generation
+        self.fn = fn
+        self.signals = _TaskSignals()
+
+    def run(self):
+        try:
+            result = self.fn()
+        except Exception as e:
+            traceback.print_exc()
+            self.signals.failed.emit(self.channel, self.generation, str(e))
+        else:
+            self.signals.finished.emit(self.channel, self.generation, result)
+
+class TaskRunner(QObject):
+    """Runs callables on a background QThreadPool and delivers results on the GUI thread.
+
+    Tasks are grouped by channel: submitting to a channel supersedes the
+    previous task there. A superseded task that has not started yet is
+    removed from the queue; one that is already running finishes, but its
+    result is dropped. One thread by default: the engine is thread-safe,
+    but a superseded refresh still running would only compete with its
+    successor for the CPU. Work that must not wait behind the models
+    (file loads) goes to a runner of its own.
+    """
+    busy_changed = pyqtSignal(bool)
+
+    def __init__(self, parent: Optional[QObject] = None, max_threads: int = 1):
+        super().__init__(parent)
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(max_threads)
+        self._generation: Dict[str, int] = {}
+        self._callbacks: Dict[str, tuple] = {}
+        self._tasks: Dict[_Task, None] = {}
+
+    def submit(self, channel: str, fn: Callable[[], Any], on_done: Callable[[Any], None],
+               on_error: Optional[Callable[[str], None]] = None) -> int:
+        self.cancel(channel)
+        gen = self._generation.get(channel, 0) + 1
+        self._generation[channel] = gen
+        self._callbacks[channel] = (on_done, on_error)
+
+        task = _Task(channel, gen, fn)
+        task.signals.finished.connect(self._on_finished)
+        task.signals.failed.connect(self._on_failed)
+        was_busy = bool(self._tasks)
+        self._tasks[task] = None
+        self.pool.start(task)
+        if not was_busy:
+            self.busy_changed.emit(True)
+        return gen
+
+    def cancel(self, channel: str) -> None:
+        self._generation[channel] = self._generation.get(channel, 0) + 1
+        self._callbacks.pop(channel, None)
+        for task in [t for t in self._tasks if t.channel == channel]:
+            if self.pool.tryTake(task):
+                self._release(task)
+
+    def is_busy(self) -> bool:
+        return bool(self._tasks)
+
+    def wait(self, msecs: int = -1) -> bool:
+        return self.pool.waitForDone(msecs)
+
+    def _release(self, task: _Task) -> None:
+        self._tasks.pop(task, None)
+        if not self._tasks:
+            self.busy_changed.emit(False)
+
+    def _current(self, channel: str, generation: int) -> bool:
+        return self._generation.get(channel) == generation and channel in self._callbacks
+
+    def _task_for(self, channel: str, generation: int) -> Optional[_Task]:
+        return next((t for t in self._tasks if t.channel == channel and t.generation == generation), None)
+
+    @pyqtSlot(str, int, object)
+    def _on_finished(self, channel: str, generation: int, result: Any) -> None:
+        current = self._current(channel, generation)
+        callbacks = self._callbacks.pop(channel, None) if current else None
+        task = self._task_for(channel, generation)
+        if task is not None:
+            self._release(task)
+        if callbacks:
+            callbacks[0](result)
+
+    @pyqtSlot(str, int, str)
+    def _on_failed(self, channel: str, generation: int, message: str) -> None:
+        current = self._current(channel, generation)
+        callbacks = self._callbacks.pop(channel, None) if current else None
+        task = self._task_for(channel, generation)
+        if task is not None:
+            self._release(task)
+        if callbacks and callbacks[1] is not None:
+            callbacks[1](message)
@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("sklearn")
+
+from app.data.sample_data import make_demo_topics
+from app.data.topic_store import TopicStore
+from app.services.forest_inference import FlatForest
+from app.services.recommender import RecommenderEngine, synthetic_training_set
+
+def _training_set(seed):
+    return synthetic_training_set(TopicStore.from_items(make_demo_topics(seed=7)), 600, seed)
+
+def _assert_matches_sklearn(models, X):
+    flat = models.flat
+    assert flat is not None
+    assert flat.n_trees == len(models.er_model.estimators_) + len(models.ctr_model.estimators_)
+    both = flat.predict(X)
+    np.testing.assert_allclose(both[:, 0], models.er_model.predict(X), rtol=0, atol=1e-12)
+    np.testing.assert_allclose(both[:, 1], models.ctr_model.predict(X), rtol=0, atol=1e-12)
+
+@pytest.fixture(scope="module")
+def engine():
+    return RecommenderEngine(seed=42, n_jobs=1)
+
+def test_flat_forest_matches_sklearn(engine):
+    X, _, _ = _training_set(42)
+    _assert_matches_sklearn(engine._predictors, X)
+
+def test_flat_forest_matches_sklearn_off_the_training_set(engine):
+    # thresholds are compared in float32, like sklearn; values next to them must split the same way
+    X, _, _ = _training_set(3)
+    X = np.vstack([X, np.nextafter(X, np.inf), np.nextafter(X, -np.inf)])
+    _assert_matches_sklearn(engine._predictors, X)
+
+def test_flat_forest_matches_sklearn_after_extend(engine):
+    X, y_er, y_ctr = _training_set(5)
+    engine.extend_predictors(X, y_er, y_ctr, n_trees=20)
+    assert len(engine.er_model.estimators_) == 220
+    _assert_matches_sklearn(engine._predictors, _training_set(42)[0])
+
+def test_flat_forest_rejects_wrong_width(engine):
+    with pytest.raises(ValueError):
+        engine._predictors.flat.predict(np.zeros((3, 4)))
+
+def test_from_sklearn_needs_shared_features():
+    from sklearn.ensemble import RandomForestRegressor
+    rng = np.random.default_rng(0)
+    a = RandomForestRegressor(n_estimators=2, max_depth=2, random_state=0).fit(rng.random((20, 3)), rng.random(20))
+    b = RandomForestRegressor(n_estimators=2, max_depth=2, random_state=0).fit(rng.random((20, 4)), rng.random(20))
+    with pytest.raises(ValueError):
+        FlatForest.from_sklearn([a, b])